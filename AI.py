@@ -1,31 +1,153 @@
+import itertools
 import time
 
+from Engine import NO_CAPTURE_LIMIT, ZOBRIST_PIECES, ZOBRIST_BLACK_TURN, position_key
+from Moves import PROMOTION
+from Tables import load_tables
+
+DRAW_SCORE = 0 #Score given to drawn positions (neither side favored)
+WIN_SCORE = 10000 #Score of a King capture (above any heuristic score), minus the nb of plies needed to reach it
+
+EVAL_CACHE_SIZE = 500000 #Max nb of heuristic scores kept by an AI (cache is cleared when full)
+TT_SIZE = 500000 #Max nb of positions kept by a transposition table (table is cleared when full)
+
+###Winner if a King was captured ("white" | "black"), None if both Kings are on the board
+def king_winner(game_state):
+    board = game_state["board"]
+    if not any('wK' in row for row in board):
+        return "black"
+    if not any('bK' in row for row in board):
+        return "white"
+    return None
+
+###Score of a position won by a King capture, from White's point of view (wins found at fewer plies score higher)
+def win_score(winner, depth):
+    return WIN_SCORE - depth if winner == "white" else depth - WIN_SCORE
+
+#Color-flip symmetry: rotating the board 180 degrees and swapping colors (and the side to move) gives
+#an equivalent position with the negated score -> both orientations share one cache/table entry
+ZOBRIST_FLIPPED = load_tables()["zobrist_flipped"] #key of the flipped piece/square
+
+###Zobrist hashes of a position and of its color-flipped twin (Returns key, flipped key) in one pass
+def position_keys(game_state):
+    black_turn = game_state["turn"] == "black"
+    key = ZOBRIST_BLACK_TURN if black_turn else 0
+    flipped_key = 0 if black_turn else ZOBRIST_BLACK_TURN #flipped position has the other side to move
+    for row in range(5):
+        board_row = game_state["board"][row]
+        for col in range(5):
+            piece = board_row[col]
+            if piece != '.':
+                key ^= ZOBRIST_PIECES[piece][row * 5 + col]
+                flipped_key ^= ZOBRIST_FLIPPED[piece][row * 5 + col]
+    return key, flipped_key
+
+###Canonical key of a position under the color-flip symmetry (Returns key, flipped)
+#flipped=True means the canonical orientation is the color-flipped position (scores must be negated, moves flipped)
+def canonical_key(game_state):
+    key, flipped_key = position_keys(game_state)
+    if flipped_key < key:
+        return flipped_key, True
+    return key, False
+
+###Packed move in the color-flipped position (square s -> 24 - s, promotion flag kept)
+def flip_move(move):
+    if move is None:
+        return None
+    flag = PROMOTION if move >= PROMOTION else 0
+    move %= PROMOTION
+    return (24 - move // 25) * 25 + 24 - move % 25 + flag
+
+class TranspositionTable:
+    ###Best move found for each searched position (position key -> (searched depth, best move)), used for move ordering
+    def __init__(self, size=TT_SIZE):
+        self.size = size
+        self.entries = {}
+
+    ###Stored (depth, move) of a position, None if unknown
+    def probe(self, key):
+        return self.entries.get(key)
+
+    ###Store the best move of a position (deeper searches are kept over shallower ones)
+    def store(self, key, depth, move):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > depth:
+            return
+        if entry is None and len(self.entries) >= self.size:
+            self.entries.clear()
+        self.entries[key] = (depth, move)
+
+    def clear(self):
+        self.entries.clear()
+
 class AI:
     ###Initialize the AI player
-    def __init__(self, game, heuristic_function, max_depth=3):
+    #tt: transposition table to use (ex: SharedTT.SharedTranspositionTable shared by worker processes), None -> private table
+    def __init__(self, game, heuristic_function, max_depth=3, telemetry=None, tt=None):
         self.game = game #store minichess instance to access game-related functions
         self.heuristic = heuristic_function #stores selected heuristic function for move evaluation
         self.max_depth = max_depth #limits how deep AI searches
         self.use_alpha_beta = game.use_alpha_beta #determine AI search strategy (True -> Alpha-Beta Pruning | False -> Regular Minimax)
         self.max_time = game.timeout - 0.01 #AI move timeout - 10ms buffer
+        self.telemetry = telemetry #optional Telemetry.SearchTelemetry recording per move / per iteration stats
 
         self.states_explored = 0 #Keep count of how many game states AI analyzes
         self.states_by_depth = {i: 0 for i in range(1, max_depth + 1)} #Dictionary stores how many nodes were explored at each depth (ex: depth 3 = {1: 0, 2: 0, 3: 0})
         self.start_time = 0 #store when AI starts thinking
+        self.seen_positions = set() #Position keys already reached in the game or on the current search path (repetition detection)
+
+        #Iterative deepening
+        self.search_depth = max_depth #depth limit of the current iteration
+        self.root_move = None #best move of the previous iteration (searched first)
+        self.timed_out = False #True once the time limit was hit during the current move
+        self.pv = [[] for _ in range(max_depth + 2)] #principal variation from each ply (triangular PV table)
+        self.move_buffers = [[] for _ in range(max_depth + 1)] #move list of each ply, reused by every node searched at that ply
+
+        #Evaluation cache (position key -> heuristic score) & transposition table (position key -> best move), kept between moves
+        self.eval_cache = {}
+        self.tt = tt if tt is not None else TranspositionTable()
+
+        #Search stats (used by telemetry)
+        self.beta_cutoffs = 0 #nb of nodes where remaining moves were pruned
+        self.first_move_cutoffs = 0 #nb of cutoffs caused by the first move searched
+        self.cache_stats = {"eval": [0, 0], "tt": [0, 0]} #cache name -> [hits, probes]
 
     ###Determines best move AI can find within the search depth and time limit
-    def get_move(self, game_state):
-        self.start_time = time.time() #Records start time to track execution time
-        self.states_explored = 0 #total states analyzed
-        self.states_by_depth = {i: 0 for i in range(1, self.max_depth + 1)} #tracks search depth stats
+    #history: position keys already played in the game | unchanged_turns: plies since the last capture
+    def get_move(self, game_state, history=None, unchanged_turns=0):
+        self.start_search(game_state, history)
 
         is_maximizing = (game_state["turn"] == "white") #if white playing -> AI maximizes (True) | if black playing -> AI minimizes (False)
+        if self.telemetry is not None:
+            self.telemetry.begin_move(game_state, self)
+
+        #Iterative deepening: search depth 1, 2, ..., max_depth (keeps the last completed iteration if time runs out)
+        best_score, best_move = None, None
+        best_by_depth = self.states_by_depth
+        for search_depth in range(1, self.max_depth + 1):
+            self.search_depth = search_depth
+            iteration_start = time.time()
+            nodes_before = self.states_explored
+            self.reset_depth_counts()
 
-        #Selects search algorithm (Alpha-Beta Pruning or Regular Minimax)
-        if self.use_alpha_beta:
-            best_score, best_move = self.alpha_beta(game_state, 0, float('-inf'), float('inf'), is_maximizing) #pass current board pos, initial depth, alpha-beta boundaries, whether max or min
-        else:
-            best_score, best_move = self.minimax(game_state, 0, is_maximizing) #pass current board pos, initial depth, whether max or min
+            #Selects search algorithm (Alpha-Beta Pruning or Regular Minimax)
+            if self.use_alpha_beta:
+                score, move = self.alpha_beta(game_state, 0, float('-inf'), float('inf'), is_maximizing, unchanged_turns) #pass current board pos, initial depth, alpha-beta boundaries, whether max or min, no-capture counter
+            else:
+                score, move = self.minimax(game_state, 0, is_maximizing, unchanged_turns) #pass current board pos, initial depth, whether max or min, no-capture counter
+
+            completed = not self.timed_out
+            if self.telemetry is not None:
+                self.telemetry.record_iteration(self, search_depth, self.states_explored - nodes_before, time.time() - iteration_start, score, completed)
+
+            #Incomplete iteration only explored some root moves -> keep previous iteration result
+            if completed or best_move is None:
+                best_score, best_move = score, move
+                best_by_depth = self.states_by_depth
+                self.root_move = move
+            if not completed:
+                break
+        self.states_by_depth = best_by_depth #per-depth states of the tree that chose the move (shallow levels aren't re-counted per iteration)
 
         #Compute total time taken for move selection
         elapsed = time.time() - self.start_time
@@ -38,101 +160,332 @@ class AI:
                 best_move = valid[0] #pick first available move
                 best_score = self.heuristic(game_state)
 
+        if self.telemetry is not None:
+            self.telemetry.end_move(self, best_move, best_score, elapsed)
+
         return best_move, best_score, elapsed, self.states_explored, self.states_by_depth
 
+    ###Reset the per-move counters and search state before searching a root position
+    def start_search(self, game_state, history):
+        self.start_time = time.time() #Records start time to track execution time
+        self.states_explored = 0 #total states analyzed (all iterations)
+        self.reset_depth_counts()
+        self.seen_positions = set(history) if history else set()
+        self.seen_positions.add(position_key(game_state)) #root position counts as already reached
+        self.root_move = None
+        self.timed_out = False
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cache_stats = {name: [0, 0] for name in self.cache_stats}
+
+    """
+    Multi-PV analysis: the k best root moves with their scores and principal variations, in one search
+
+    Args:
+        - game_state:       root position
+        - k:                number of lines (at least 1, ValueError otherwise)
+        - history, unchanged_turns: same as get_move
+    Returns:
+        - lines:            list of (move, score, pv) best first (at most k, fewer if there are fewer legal moves)
+        - elapsed, states_explored, states_by_depth: same as get_move
+    """
+    def get_lines(self, game_state, k=3, history=None, unchanged_turns=0):
+        if k < 1:
+            raise ValueError(f"k must be at least 1 (got {k})")
+        self.start_search(game_state, history)
+        is_maximizing = (game_state["turn"] == "white")
+        if self.telemetry is not None:
+            self.telemetry.begin_move(game_state, self)
+
+        #Iterative deepening like get_move (lines of the last completed iteration are kept if time runs out)
+        lines = []
+        lines_by_depth = self.states_by_depth
+        for search_depth in range(1, self.max_depth + 1):
+            self.search_depth = search_depth
+            iteration_start = time.time()
+            nodes_before = self.states_explored
+            self.reset_depth_counts()
+            iteration_lines = self.search_lines(game_state, k, is_maximizing, unchanged_turns, [line[0] for line in lines])
+
+            completed = not self.timed_out
+            self.pv[0] = list(iteration_lines[0][2]) if iteration_lines else []
+            if self.telemetry is not None:
+                score = iteration_lines[0][1] if iteration_lines else None
+                self.telemetry.record_iteration(self, search_depth, self.states_explored - nodes_before, time.time() - iteration_start, score, completed)
+            if completed or not lines:
+                lines = iteration_lines
+                lines_by_depth = self.states_by_depth
+            if not completed:
+                break
+        self.states_by_depth = lines_by_depth
+
+        elapsed = time.time() - self.start_time
+        if self.telemetry is not None:
+            self.telemetry.end_move(self, lines[0][0] if lines else None, lines[0][1] if lines else None, elapsed)
+        return lines, elapsed, self.states_explored, self.states_by_depth
+
+    ###Root search keeping the k best moves: each root move is searched with a window that only lets it through
+    #if it beats the current k-th best line (others fail low / high cheaply); tables are shared by all root moves
+    def search_lines(self, game_state, k, is_maximizing, unchanged_turns, previous_moves):
+        self.states_explored += 1
+        self.states_by_depth[1] += 1
+        if king_winner(game_state) is not None:
+            return []
+        _, _, canonical = self.check_draw(game_state, 0, unchanged_turns)
+
+        #Root moves: best lines of the previous iteration first, then the staged order
+        moves = list(self.game.staged_moves(game_state, self.probe_hash_move(canonical), self.move_buffers[0]))
+        moves = [m for m in previous_moves if m in moves] + [m for m in moves if m not in previous_moves]
+
+        lines = [] #(move, score, pv), best first
+        for m in moves:
+            if self.time_up():
+                break
+            alpha, beta = float('-inf'), float('inf')
+            if len(lines) == k: #only moves better than the k-th line matter
+                if is_maximizing:
+                    alpha = lines[-1][1]
+                else:
+                    beta = lines[-1][1]
+            new_state = self.game.make_move(game_state, m, update_game=False)
+            child_unchanged = self.game.next_unchanged_turns(game_state, m, unchanged_turns)
+            if self.use_alpha_beta:
+                score, _ = self.alpha_beta(new_state, 1, alpha, beta, not is_maximizing, child_unchanged)
+            else:
+                score, _ = self.minimax(new_state, 1, not is_maximizing, child_unchanged)
+            if self.timed_out:
+                break
+            if len(lines) == k and (score <= alpha if is_maximizing else score >= beta): #failed low/high -> not in the top k
+                continue
+
+            lines.append((m, score, [m] + self.pv[1]))
+            lines.sort(key=lambda line: -line[1] if is_maximizing else line[1]) #stable: earlier moves first on ties
+            del lines[k:]
+
+        if lines and not self.timed_out:
+            self.store_best_move(canonical, 0, lines[0][0])
+        return lines
+
+    ###Start new per-depth state counts (one count per iteration: the root and shallow levels are searched again by every iteration)
+    def reset_depth_counts(self):
+        self.states_by_depth = {i: 0 for i in range(1, self.max_depth + 1)}
+
+    ###Check if the time limit is reached (remembered so the current iteration is known to be incomplete)
+    def time_up(self):
+        if not self.timed_out and (time.time() - self.start_time) >= self.max_time:
+            self.timed_out = True
+        return self.timed_out
+
+    ###Heuristic score of a position, cached by canonical key (one entry serves both colors, score negated when flipped)
+    def evaluate(self, game_state, canonical):
+        stats = self.cache_stats["eval"]
+        stats[1] += 1
+        key, flipped = canonical
+        score = self.eval_cache.get(key)
+        if score is not None:
+            stats[0] += 1
+            return -score if flipped else score
+        score = self.heuristic(game_state)
+        if len(self.eval_cache) >= EVAL_CACHE_SIZE:
+            self.eval_cache.clear()
+        self.eval_cache[key] = -score if flipped else score
+        return score
+
+    ###Check the game's draw rules for a position reached inside the search
+    #Returns is_draw, position key (repetitions), (canonical key, flipped) (caches & tables)
+    def check_draw(self, game_state, depth, unchanged_turns):
+        key, flipped_key = position_keys(game_state)
+        canonical = (flipped_key, True) if flipped_key < key else (key, False)
+        if depth == 0: #root is the real game position, rules were already checked by MiniChess
+            return False, key, canonical
+        if unchanged_turns >= NO_CAPTURE_LIMIT: #too many plies without capture -> game would be declared a draw
+            return True, key, canonical
+        if key in self.seen_positions: #position repeated -> shuffling back and forth cannot gain anything
+            return True, key, canonical
+        return False, key, canonical
+
+    ###Best move stored in the transposition table for a position (hash move), None if unknown
+    def probe_hash_move(self, canonical):
+        stats = self.cache_stats["tt"]
+        stats[1] += 1
+        key, flipped = canonical
+        entry = self.tt.probe(key)
+        if entry is None:
+            return None
+        stats[0] += 1
+        return flip_move(entry[1]) if flipped else entry[1] #moves are stored in canonical orientation
+
+    ###Moves of a position, with the previous iteration's best move first at the root
+    def ordered_moves(self, game_state, depth):
+        moves = self.game.valid_moves(game_state, self.move_buffers[depth]) #retrieve all legal moves (into the ply's move buffer)
+        if depth == 0 and self.root_move in moves:
+            moves.remove(self.root_move)
+            moves.insert(0, self.root_move)
+        return moves
+
     ###Determine best move using Minimax (Returns score, move)
-    def minimax(self, game_state, depth, is_maximizing):
+    def minimax(self, game_state, depth, is_maximizing, unchanged_turns=0):
         #track explored states
         self.states_explored += 1 #increment state count for AI stats
         if depth < self.max_depth:
             self.states_by_depth[depth + 1] += 1 #records how many states explored at each depth
+        self.pv[depth] = []
+
+        #King captured -> game over, no moves are generated for the side without a King
+        winner = king_winner(game_state)
+        if winner is not None:
+            return win_score(winner, depth), None
+
+        #Check draw rules (no-capture counter & repeated positions) -> cut off right away
+        is_draw, key, canonical = self.check_draw(game_state, depth, unchanged_turns)
+        if is_draw:
+            return DRAW_SCORE, None
 
         #Check time limit
-        if (time.time() - self.start_time) >= self.max_time:
-            return self.heuristic(game_state), None
+        if self.time_up():
+            return self.evaluate(game_state, canonical), None
 
-        #Check depth limit (stop searching deeper than max_depth)
-        if depth == self.max_depth:
-            return self.heuristic(game_state), None
+        #Check depth limit (stop searching deeper than the current iteration depth)
+        if depth == self.search_depth:
+            return self.evaluate(game_state, canonical), None
 
         #Get all possible moves
-        moves = self.game.valid_moves(game_state) #retrieve all legal moves
+        moves = self.ordered_moves(game_state, depth)
         if not moves: #if no moves -> evaluate directly
-            return self.heuristic(game_state), None
+            return self.evaluate(game_state, canonical), None
+
+        #Mark position as on the current search path while its children are explored (root is already in seen_positions)
+        path_key = key if depth > 0 else None
+        if path_key is not None:
+            self.seen_positions.add(path_key)
 
         #Maximizing player (white)
         best_move = None
         if is_maximizing:
             best_score = float('-inf') #start with lowest possible score
             for m in moves:
-                if (time.time() - self.start_time) >= self.max_time:
+                if self.time_up():
                     break
                 new_state = self.game.make_move(game_state, m, update_game=False) #simulate move
-                score, _ = self.minimax(new_state, depth + 1, False) #repeat (recursive) with minimizing player
+                score, _ = self.minimax(new_state, depth + 1, False, self.game.next_unchanged_turns(game_state, m, unchanged_turns)) #repeat (recursive) with minimizing player
                 if score > best_score:
                     best_score = score
                     best_move = m #update best move
+                    self.pv[depth] = [m] + self.pv[depth + 1] #update principal variation
+            self.seen_positions.discard(path_key)
             return best_score, best_move
         else: #Minimizing player (black)
             best_score = float('inf') #Start with highest possible score
             for m in moves:
-                if (time.time() - self.start_time) >= self.max_time:
+                if self.time_up():
                     break
                 new_state = self.game.make_move(game_state, m, update_game=False) #simulate move
-                score, _ = self.minimax(new_state, depth + 1, True) #repeat (recursive) with maximizing player
+                score, _ = self.minimax(new_state, depth + 1, True, self.game.next_unchanged_turns(game_state, m, unchanged_turns)) #repeat (recursive) with maximizing player
                 if score < best_score:
                     best_score = score
                     best_move = m #update best move
+                    self.pv[depth] = [m] + self.pv[depth + 1] #update principal variation
+            self.seen_positions.discard(path_key)
             return best_score, best_move
 
     ###Determine best move using Alpha-Beta Pruning
-    def alpha_beta(self, game_state, depth, alpha, beta, is_maximizing):
+    def alpha_beta(self, game_state, depth, alpha, beta, is_maximizing, unchanged_turns=0):
         #track explored states
         self.states_explored += 1 #increment state count for AI stats
         if depth < self.max_depth:
             self.states_by_depth[depth + 1] += 1 #records how many states explored at each depth
+        self.pv[depth] = []
+
+        #King captured -> game over, no moves are generated for the side without a King
+        winner = king_winner(game_state)
+        if winner is not None:
+            return win_score(winner, depth), None
+
+        #Mate-distance pruning: no line from here wins faster than a King capture on the next ply
+        #-> if a faster win is already guaranteed elsewhere, this subtree can't change the result
+        if depth > 0:
+            bound = WIN_SCORE - depth - 1
+            if is_maximizing and alpha >= bound:
+                return bound, None
+            if not is_maximizing and beta <= -bound:
+                return -bound, None
+            alpha = max(alpha, -bound)
+            beta = min(beta, bound)
+
+        #Check draw rules (no-capture counter & repeated positions) -> cut off right away
+        is_draw, key, canonical = self.check_draw(game_state, depth, unchanged_turns)
+        if is_draw:
+            return DRAW_SCORE, None
 
         #Check time limit
-        if (time.time() - self.start_time) >= self.max_time:
-            return self.heuristic(game_state), None
+        if self.time_up():
+            return self.evaluate(game_state, canonical), None
 
         #Check depth limit
-        if depth == self.max_depth:
-            return self.heuristic(game_state), None
+        if depth == self.search_depth:
+            return self.evaluate(game_state, canonical), None
 
-        #Get all possible moves
-        moves = self.game.valid_moves(game_state) #retrieve all legal moves
-        if not moves: #if no moves -> evaluate directly
-            return self.heuristic(game_state), None
+        #Moves are generated lazily in stages (hash move, captures, promotions, quiet moves) -> a cutoff skips the remaining stages
+        hash_move = self.root_move if depth == 0 and self.root_move is not None else self.probe_hash_move(canonical)
+        moves = self.game.staged_moves(game_state, hash_move, self.move_buffers[depth])
+        first_move = next(moves, None)
+        if first_move is None: #if no moves -> evaluate directly
+            return self.evaluate(game_state, canonical), None
+        moves = itertools.chain([first_move], moves)
+
+        #Mark position as on the current search path while its children are explored (root is already in seen_positions)
+        path_key = key if depth > 0 else None
+        if path_key is not None:
+            self.seen_positions.add(path_key)
 
         best_move = None
 
         #Maximizing player (White)
         if is_maximizing:
             value = float('-inf') #start with lowest possible score
-            for m in moves:
-                if (time.time() - self.start_time) >= self.max_time:
+            for i, m in enumerate(moves):
+                if self.time_up():
                     break
                 new_state = self.game.make_move(game_state, m, update_game=False) #simulate move
-                score, _ = self.alpha_beta(new_state, depth + 1, alpha, beta, False) #repeat (recursive) with minimizing player
+                score, _ = self.alpha_beta(new_state, depth + 1, alpha, beta, False, self.game.next_unchanged_turns(game_state, m, unchanged_turns)) #repeat (recursive) with minimizing player
                 if score > value:
                     value = score
                     best_move = m #Update best move
+                    self.pv[depth] = [m] + self.pv[depth + 1] #update principal variation
                 alpha = max(alpha, value) #update alpha
                 if alpha >= beta: #prune remaining branches
+                    self.count_cutoff(i)
                     break
+            self.seen_positions.discard(path_key)
+            self.store_best_move(canonical, depth, best_move)
             return value, best_move
         else: #Minimizing player (Black)
             value = float('inf') #start with highest possible score
-            for m in moves:
-                if (time.time() - self.start_time) >= self.max_time:
+            for i, m in enumerate(moves):
+                if self.time_up():
                     break
                 new_state = self.game.make_move(game_state, m, update_game=False) #simulate move
-                score, _ = self.alpha_beta(new_state, depth + 1, alpha, beta, True) #repeat (recursive) with maximizing player
+                score, _ = self.alpha_beta(new_state, depth + 1, alpha, beta, True, self.game.next_unchanged_turns(game_state, m, unchanged_turns)) #repeat (recursive) with maximizing player
                 if score < value:
                     value = score
                     best_move = m #update best move
+                    self.pv[depth] = [m] + self.pv[depth + 1] #update principal variation
                 beta = min(beta, value) #update beta
                 if beta <= alpha: #prune remaining branches
+                    self.count_cutoff(i)
                     break
-            return value, best_move
\ No newline at end of file
+            self.seen_positions.discard(path_key)
+            self.store_best_move(canonical, depth, best_move)
+            return value, best_move
+
+    ###Remember the best move of a fully searched position (searched first next time: hash move)
+    def store_best_move(self, canonical, depth, best_move):
+        if best_move is not None and not self.timed_out:
+            key, flipped = canonical
+            self.tt.store(key, self.search_depth - depth, flip_move(best_move) if flipped else best_move)
+
+    ###Record a beta cutoff caused by the i-th move searched (0 = first move)
+    def count_cutoff(self, i):
+        self.beta_cutoffs += 1
+        if i == 0:
+            self.first_move_cutoffs += 1
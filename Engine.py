@@ -0,0 +1,940 @@
+#Engine core: board rules, move generation and evaluation of Mini Chess, without console prompts, logs or game loop
+#Importing this module (and AI.py for the search) has no side effects: tools and worker processes build a
+#MiniChessEngine directly, MiniChess.py adds the interactive game (prompts, game trace, display) on top of it
+import json
+import os
+from bisect import insort
+
+from Moves import PROMOTION, SQUARE_ROW_COL, KNIGHT_TARGETS, KING_TARGETS, BISHOP_RAYS, QUEEN_RAYS, move_end, move_start
+from Tables import load_tables
+
+#Draw rule of MiniChess.make_move (also used by the AI search)
+NO_CAPTURE_LIMIT = 20 #20 plies (10 full turns) without a capture -> draw
+
+#Zobrist keys used to hash positions (fixed seed so keys are identical across runs, generated by Tables.py)
+_tables = load_tables()
+ZOBRIST_PIECES = _tables["zobrist_pieces"]
+ZOBRIST_BLACK_TURN = _tables["zobrist_black_turn"]
+
+#Material value of each piece type (same values as heuristic e0)
+PIECE_VALUES = {'p': 1, 'B': 3, 'N': 3, 'Q': 9, 'K': 999}
+#Piece values used by the attack penalty of heuristic e1/e2 (King counted as 20)
+ATTACK_VALUES = {'p': 1, 'B': 3, 'N': 3, 'Q': 9, 'K': 20}
+#Piece value rank (move ordering: most valuable victim / least valuable attacker)
+PIECE_RANKS = {'p': 0, 'B': 1, 'N': 1, 'Q': 2, 'K': 3}
+
+#Weights of the positional terms used by heuristic_e1 / heuristic_e2 (material values are fixed by e0)
+E1_TERMS = ["pawn_advancement", "center", "queen_mobility", "attack_penalty"]
+E2_TERMS = ["central_control", "king_safety", "coordination", "pawn_structure", "initiative"]
+DEFAULT_HEURISTIC_WEIGHTS = {
+    "pawn_advancement": 0.2, #per row advanced toward promotion
+    "center": 0.15, #per step closer to the center (Knights & Bishops)
+    "queen_mobility": 0.1, #per valid Queen move
+    "attack_penalty": 0.15, #per enemy attacker, times value of the attacked piece (attack_term="see": times material lost in the exchange)
+    "central_control": 0.15, #per central square controlled
+    "king_safety": 0.2, #per enemy attack in the king zone
+    "coordination": 0.1, #per friendly defender
+    "pawn_structure": 0.15, #per diagonally connected pawn
+    "initiative": 0.1, #for having the move
+}
+
+#Tuned weights written by Tuner.py, one file per heuristic (optional, defaults are used if missing)
+HEURISTIC_WEIGHTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+###Compute the Zobrist hash of a position (board + side to move), repetition history of games and AI search
+def position_key(game_state):
+    key = ZOBRIST_BLACK_TURN if game_state["turn"] == "black" else 0
+    for row in range(5):
+        board_row = game_state["board"][row]
+        for col in range(5):
+            piece = board_row[col]
+            if piece != '.':
+                key ^= ZOBRIST_PIECES[piece][row * 5 + col] #xor in key for piece on this square
+    return key
+
+###Path of the tuned weights file of a heuristic (ex: heuristic_weights_e2.json)
+def heuristic_weights_file(heuristic):
+    return os.path.join(HEURISTIC_WEIGHTS_DIR, f"heuristic_weights_{heuristic}.json")
+
+"""
+Load the tuned weights of a heuristic, falling back to the defaults for missing terms/file
+A file is only used if it was fitted for the same heuristic and attack term (weights fitted on other features are ignored)
+
+Args:
+    - heuristic:    "e1" | "e2" (other heuristics have no weights -> defaults)
+    - attack_term:  attack penalty feature the weights must have been fitted with ("attackers" | "see")
+    - path:         weights file, None -> heuristic_weights_file(heuristic)
+Returns:
+    - weights:  dictionary | term -> weight
+"""
+def load_heuristic_weights(heuristic, attack_term="attackers", path=None):
+    weights = dict(DEFAULT_HEURISTIC_WEIGHTS)
+    if path is None:
+        if heuristic not in ("e1", "e2"):
+            return weights
+        path = heuristic_weights_file(heuristic)
+    if not os.path.exists(path):
+        return weights
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("heuristic") != heuristic or data.get("attack_term") != attack_term: #fitted for other settings
+        return weights
+    for term, value in data.get("weights", {}).items():
+        if term in weights:
+            weights[term] = float(value)
+    return weights
+
+class MiniChessEngine:
+    """
+    Rules and evaluation settings of a game (no prompts, logs or game loop)
+
+    Args:
+        - heuristic:        "e0" | "e1" | "e2" evaluation used by the AI (None -> no AI)
+        - timeout:          AI move timeout in seconds
+        - use_alpha_beta:   bool | alpha-beta (True) or minimax (False) AI search
+        - max_turns:        nb of full turns before the game is a draw
+        - attack_term:      e1/e2 attack penalty: "attackers" (per enemy attacker) | "see" (material lost by static exchange)
+    """
+    def __init__(self, heuristic="e2", timeout=5, use_alpha_beta=True, max_turns=100, attack_term="attackers"):
+        self.heuristic_name = heuristic
+        self.heuristic_func = getattr(self, f"heuristic_{heuristic}") if heuristic else None
+        self.timeout = timeout
+        self.use_alpha_beta = use_alpha_beta
+        self.max_turns = max_turns
+        self.weights = load_heuristic_weights(heuristic, attack_term) #Weights of heuristic e1/e2 positional terms
+        self.attack_term = attack_term
+
+    """
+    Initialize the board
+
+    Args:
+        - None
+    Returns:
+        - state: A dictionary representing the state of the game
+    """
+    def init_board(self):
+        state = {
+            "board": [
+                ['bK', 'bQ', 'bB', 'bN', '.'],
+                ['.', '.', 'bp', 'bp', '.'],
+                ['.', '.', '.', '.', '.'],
+                ['.', 'wp', 'wp', '.', '.'],
+                ['.', 'wN', 'wB', 'wQ', 'wK']
+            ],
+            "turn": 'white'
+        }
+        return state
+
+    """
+    Check if the move is valid    
+    
+    Args: 
+        - game_state:   dictionary | Dictionary representing the current game state
+        - move          int | the packed move which we check the validity of (from-square * 25 + to-square, + PROMOTION, see Moves.py)
+    Returns:
+        - boolean representing the validity of the move
+    """
+    def is_valid_move(self, game_state, move):
+        #Check if move is within bounds (squares 0-24, optional promotion flag)
+        if not (0 <= move < 2 * PROMOTION):
+            return False
+
+        #Unpack move into start and end positions
+        start = SQUARE_ROW_COL[move_start(move)]
+        end = SQUARE_ROW_COL[move_end(move)]
+        start_row, start_col = start
+        end_row, end_col = end
+
+        #Identify piece at start/end pos
+        piece = game_state["board"][start_row][start_col]
+        target_piece = game_state["board"][end_row][end_col]
+
+        #Check if start square has a piece
+        if piece == '.':
+            return False
+
+        #Check if piece belongs to current player
+        if piece[0] != game_state["turn"][0]: #'w' for white, 'b' for black
+            return False
+
+        #Check if target square is occupied by player's own piece
+        if target_piece != '.' and target_piece[0] == piece[0]:
+            return False
+
+        #Extract piece type
+        piece_type = piece[1]
+
+        #Calculate row and col diff between start/end 
+        row_diff = abs(end_row - start_row)
+        col_diff = abs(end_col - start_col)
+
+        if piece_type == 'K': #King
+            if row_diff > 1 or col_diff > 1: #King can move 1 square in any direction
+                return False
+        elif piece_type == 'Q': #Queen
+            if row_diff != 0 and col_diff != 0 and row_diff != col_diff: #Queen moves straight & diagonal: if row & col != 0 -> both need ==
+                return False
+            #Check for obstructions in path
+            if not self.is_path_clear(game_state, start, end):
+                return False
+        elif piece_type == 'B': #Bishop
+            if row_diff != col_diff: #Bishop moves diagonal: row == col
+                return False
+            #Check for obstructions in path
+            if not self.is_path_clear(game_state, start, end):
+                return False
+        elif piece_type == 'N': #Knight
+            if not ((row_diff == 2 and col_diff == 1) or (row_diff == 1 and col_diff == 2)): #Knight moves "L"
+                return False
+        elif piece_type == 'p': #Pawn
+            if piece[0] == 'w': #White pawn
+                if end_row >= start_row: #Pawns can only move forward (up: 5 -> 1 == 0 -> 4)
+                    return False
+                if row_diff != 1: #Move 1 row only
+                    return False
+                if col_diff == 0: #Forward move (no capture)
+                    if target_piece != '.': #Forward square must be empty
+                        return False
+                elif col_diff == 1: #Diagonal capture move
+                    if target_piece == '.' or target_piece[0] == 'w': #Must capture opponent's piece
+                        return False
+                else:
+                    return False #Any other movement is invalid
+            else: #Black pawn
+                if end_row <= start_row: #Pawns can only move forward (down: 5 -> 1 == 0 -> 4)
+                    return False
+                if row_diff != 1:
+                    return False
+                if col_diff == 0: 
+                    if target_piece != '.': 
+                        return False
+                elif col_diff == 1:
+                    if target_piece == '.' or target_piece[0] == 'b': 
+                        return False
+                else:
+                    return False #Any other movement is invalid
+        else:
+            return False #Unrecognized piece type
+
+        #Promotion flag must be set exactly when a pawn reaches its last row
+        if (move >= PROMOTION) != (piece_type == 'p' and end_row == (0 if piece[0] == 'w' else 4)):
+            return False
+
+        #if all checks pass, move is valid
+        return True
+
+    ###Check if path between two squares is clear (no pieces blocking the way)
+    def is_path_clear(self, game_state, start, end):
+        start_row, start_col = start
+        end_row, end_col = end
+
+        #Determine direction of movement (step size per row/col)
+        row_step = 1 if end_row > start_row else -1 if end_row < start_row else 0 #(down = 1 | up = -1 | else = 0)
+        col_step = 1 if end_col > start_col else -1 if end_col < start_col else 0 #(right = 1 | left = -1 | else = 0)
+
+        #Check each square along path (excluding start & end squares)
+        current_row, current_col = start_row + row_step, start_col + col_step
+        while (current_row != end_row) or (current_col != end_col):
+            #If any square along path is not empty, return False (path blocked)
+            if game_state["board"][current_row][current_col] != '.':
+                return False  #Path is blocked
+            
+            #Move to next square along path
+            current_row += row_step
+            current_col += col_step
+
+        return True #if loop completes, path is clear
+
+    """
+    Returns a list of valid moves
+
+    Args:
+        - game_state:   dictionary | Dictionary representing the current game state
+        - buffer:       list | list reused to store the moves (ex: per-ply move buffer of the AI), None -> new list
+    Returns:
+        - valid moves:   list | A list of packed moves (from-square * 25 + to-square, + PROMOTION, see Moves.py)
+    """
+    def valid_moves(self, game_state, buffer=None):
+        #return list of all valid moves
+        valid_moves = [] if buffer is None else buffer
+        valid_moves.clear()
+        board = game_state["board"]
+        color = game_state["turn"][0]
+
+        #Iterate through each square on the board (5x5)
+        for square in range(25):
+            row, col = SQUARE_ROW_COL[square]
+            piece = board[row][col]
+
+            #If square contains piece and belongs to current player, add all its moves
+            if piece != '.' and piece[0] == color:
+                self.piece_moves(board, square, piece, valid_moves)
+        return valid_moves
+
+    ###Append the valid moves of the piece on a square to a list (precomputed move tables, same rules as is_valid_move)
+    def piece_moves(self, board, square, piece, moves):
+        color, piece_type = piece
+        base = square * 25
+        if piece_type == 'N' or piece_type == 'K':
+            for end in (KNIGHT_TARGETS if piece_type == 'N' else KING_TARGETS)[square]:
+                end_row, end_col = SQUARE_ROW_COL[end]
+                target = board[end_row][end_col]
+                if target == '.' or target[0] != color: #empty or opponent's piece
+                    moves.append(base + end)
+        elif piece_type == 'Q' or piece_type == 'B':
+            for ray in (QUEEN_RAYS if piece_type == 'Q' else BISHOP_RAYS)[square]:
+                for end in ray: #slide until the first piece
+                    end_row, end_col = SQUARE_ROW_COL[end]
+                    target = board[end_row][end_col]
+                    if target == '.':
+                        moves.append(base + end)
+                        continue
+                    if target[0] != color:
+                        moves.append(base + end)
+                    break
+        elif piece_type == 'p':
+            row, col = SQUARE_ROW_COL[square]
+            end_row = row - 1 if color == 'w' else row + 1 #White pawns move up, Black pawns move down
+            if 0 <= end_row < 5:
+                flag = PROMOTION if end_row == (0 if color == 'w' else 4) else 0
+                end = end_row * 5 + col
+                if board[end_row][col] == '.': #forward move to an empty square
+                    moves.append(base + end + flag)
+                for dc in (-1, 1): #diagonal captures
+                    if 0 <= col + dc < 5:
+                        target = board[end_row][col + dc]
+                        if target != '.' and target[0] != color:
+                            moves.append(base + end + dc + flag)
+        return moves
+
+    ###Append the moves of the piece on a square to empty squares (no captures, no promotions) to a list
+    def quiet_moves(self, board, square, piece, moves):
+        color, piece_type = piece
+        base = square * 25
+        if piece_type == 'N' or piece_type == 'K':
+            for end in (KNIGHT_TARGETS if piece_type == 'N' else KING_TARGETS)[square]:
+                end_row, end_col = SQUARE_ROW_COL[end]
+                if board[end_row][end_col] == '.':
+                    moves.append(base + end)
+        elif piece_type == 'Q' or piece_type == 'B':
+            for ray in (QUEEN_RAYS if piece_type == 'Q' else BISHOP_RAYS)[square]:
+                for end in ray: #slide until the first piece
+                    end_row, end_col = SQUARE_ROW_COL[end]
+                    if board[end_row][end_col] != '.':
+                        break
+                    moves.append(base + end)
+        elif piece_type == 'p':
+            row, col = SQUARE_ROW_COL[square]
+            end_row = row - 1 if color == 'w' else row + 1
+            if 0 < end_row < 4 and board[end_row][col] == '.': #forward move, last row excluded (promotion stage)
+                moves.append(base + end_row * 5 + col)
+        return moves
+
+    """
+    Generate valid moves lazily, in stages (each stage is only computed when the search asks for more moves)
+
+    Args:
+        - game_state:   dictionary | Dictionary representing the current game state
+        - hash_move:    int | best move stored for this position (searched first if still valid)
+        - buffer:       list | list reused to store the quiet moves (per-ply move buffer of the AI)
+    Yields:
+        - moves in order: hash move, captures that don't lose material (most valuable victim first -> King captures first,
+          then least valuable attacker), promotions, quiet moves (least valuable piece first), losing captures (static exchange < 0)
+    """
+    def staged_moves(self, game_state, hash_move=None, buffer=None):
+        board = game_state["board"]
+        color = game_state["turn"][0]
+        last_row = 0 if color == 'w' else 4
+
+        #1) Hash move
+        if hash_move is not None and self.is_valid_move(game_state, hash_move):
+            yield hash_move
+
+        #2) Captures (MVV-LVA): only the squares of enemy pieces are scanned for attackers
+        #Captures losing material (static exchange < 0) are delayed after quiet moves
+        #(a victim worth at least its attacker can't lose material -> no exchange computed)
+        victims = []
+        for square in range(25):
+            row, col = SQUARE_ROW_COL[square]
+            piece = board[row][col]
+            if piece != '.' and piece[0] != color:
+                victims.append((-PIECE_RANKS[piece[1]], square))
+        victims.sort()
+        losing_captures = []
+        for _, end in victims:
+            end_pos = SQUARE_ROW_COL[end]
+            victim_value = PIECE_VALUES[board[end_pos[0]][end_pos[1]][1]]
+            attackers = self.attackers_of(board, end_pos, color)
+            attackers.sort(key=lambda pos: (PIECE_RANKS[board[pos[0]][pos[1]][1]], pos))
+            for start_row, start_col in attackers:
+                attacker = board[start_row][start_col][1]
+                move = (start_row * 5 + start_col) * 25 + end
+                if attacker == 'p' and end_pos[0] == last_row:
+                    move += PROMOTION
+                if move == hash_move:
+                    continue
+                if victim_value < PIECE_VALUES[attacker] and self.static_exchange(game_state, move) < 0:
+                    losing_captures.append(move)
+                    continue
+                yield move
+
+        #3) Promotions (pawn moving forward to the last row)
+        pawn_row = last_row + 1 if color == 'w' else last_row - 1
+        for col in range(5):
+            if board[pawn_row][col] == color + 'p' and board[last_row][col] == '.':
+                move = (pawn_row * 5 + col) * 25 + last_row * 5 + col + PROMOTION
+                if move != hash_move:
+                    yield move
+
+        #4) Quiet moves (to empty squares, promotions excluded), generated into the ply's buffer
+        moves = [] if buffer is None else buffer
+        moves.clear()
+        for square in range(25):
+            row, col = SQUARE_ROW_COL[square]
+            piece = board[row][col]
+            if piece != '.' and piece[0] == color:
+                self.quiet_moves(board, square, piece, moves)
+        moves.sort(key=lambda move: (PIECE_RANKS[board[move // 125][move // 25 % 5][1]], move))
+        for move in moves:
+            if move != hash_move:
+                yield move
+
+        #5) Losing captures
+        for move in losing_captures:
+            yield move
+
+    """
+    Modify to board to make a move
+
+    Args: 
+        - game_state:   dictionary | Dictionary representing the current game state
+        - move          int | the packed move to perform (see Moves.py)
+        - update_game:  bool | True -> modify game_state in place, False -> return a new state (AI search)
+    Returns:
+        - game_state:   dictionary | Dictionary representing the modified game state
+    """
+    def make_move(self, game_state, move, update_game=False):
+        #Create copy of game state to not modify original (AI needs to evaluate potential moves without changing actual game state)
+        if update_game:
+            new_state = game_state #modify original state
+        else:
+            new_state = {"board": [row[:] for row in game_state["board"]], "turn": game_state["turn"]} #work on a copy (rows copied, pieces are strings)
+        
+        start_row, start_col = SQUARE_ROW_COL[move % PROMOTION // 25] #Starting pos (row, col)
+        end_row, end_col = SQUARE_ROW_COL[move % 25] #Destination pos (row, col)
+        piece = new_state["board"][start_row][start_col] #Get piece being moved
+
+        #Pawn promotion (flag set when a pawn reaches its last row: row 0 for White, row 4 for Black)
+        if move >= PROMOTION:
+            piece = piece[0] + 'Q' #Promote to Queen
+
+        #Update the board
+        new_state["board"][start_row][start_col] = '.' #Clear old pos
+        new_state["board"][end_row][end_col] = piece #Place piece in new pos
+
+        #Switch turns/player
+        new_state["turn"] = "black" if new_state["turn"] == "white" else "white"
+        return new_state
+
+    ###No-capture counter after playing move from game_state (reset on capture)
+    def next_unchanged_turns(self, game_state, move, unchanged_turns):
+        end_row, end_col = SQUARE_ROW_COL[move % 25]
+        if game_state["board"][end_row][end_col] != '.': #target square occupied -> capture
+            return 0
+        return unchanged_turns + 1
+
+    """
+    Play a move of a headless game and update its draw counter and repetition history (same rules as MiniChess.make_move)
+
+    Args:
+        - game_state:       dictionary | position before the move (not modified)
+        - move:             int | packed move
+        - unchanged_turns:  int | plies since the last capture
+        - history:          list | position keys since the last capture (not modified), None -> not tracked
+    Returns:
+        - new_state:        dictionary | position after the move
+        - unchanged_turns:  int | plies since the last capture, including this move
+        - history:          list | new list of position keys since the last capture, ending with new_state (None if not tracked)
+    """
+    def play_move(self, game_state, move, unchanged_turns, history):
+        unchanged_turns = self.next_unchanged_turns(game_state, move, unchanged_turns)
+        new_state = self.make_move(game_state, move, update_game=False)
+        if history is not None:
+            history = (history if unchanged_turns else []) + [position_key(new_state)]
+        return new_state, unchanged_turns, history
+
+    """
+    Check the win/draw conditions of MiniChess.make_move without logging or exiting (used by headless games)
+
+    Args:
+        - game_state:       dictionary | position reached after a move
+        - unchanged_turns:  int | plies since the last capture (including the move just played)
+        - turn_count:       int | full turn number (incremented after Black has moved, like MiniChess.turn_count)
+    Returns:
+        - result:   "white" | "black" (winner), "draw", or None if the game continues
+    """
+    def game_result(self, game_state, unchanged_turns, turn_count):
+        pieces = {cell for row in game_state["board"] for cell in row}
+        if 'wK' not in pieces:
+            return "black"
+        if 'bK' not in pieces:
+            return "white"
+        if unchanged_turns >= NO_CAPTURE_LIMIT:
+            return "draw"
+        if turn_count > self.max_turns and game_state["turn"] == "white": #Black completed the final turn
+            return "draw"
+        return None
+
+    #Heuristic functions
+    def heuristic_e0(self, game_state):
+        """
+        Basic material-based heuristic e0:
+          Pawn=1, Bishop=3, Knight=3, Queen=9, King=999
+          e0 = (WhiteTotal) - (BlackTotal)
+          positive score favors White, negative score favors Black
+        """
+        #Initialize scores for White and Black
+        white_score = 0
+        black_score = 0
+
+        #Loop through every row of the board
+        for row in game_state["board"]:
+            for cell in row: #Iterate through each cell in the row
+                #Evaluate White pieces
+                if cell == 'wp': #White Pawn
+                    white_score += 1
+                elif cell == 'wB': #White Bishop
+                    white_score += 3
+                elif cell == 'wN': #White Knight
+                    white_score += 3
+                elif cell == 'wQ': #White Queen
+                    white_score += 9
+                elif cell == 'wK': #White King
+                    white_score += 999
+
+                #Evaluate Black pieces
+                elif cell == 'bp': #Black Pawn
+                    black_score += 1
+                elif cell == 'bB': #Black Bishop
+                    black_score += 3
+                elif cell == 'bN': #Black Knight
+                    black_score += 3
+                elif cell == 'bQ': #Black Queen
+                    black_score += 9
+                elif cell == 'bK': #Black King
+                    black_score += 999
+
+        #Compute heuristic value
+        return white_score - black_score
+    
+    def heuristic_e1(self, game_state):
+        """
+        Advanced heuristic e1: Base material values (same as e0) + positional bonuses:
+        - Pawns get bonus for advancement toward promotion
+        - Knights and Bishops get bonus for central positions
+        - Queens get bonus for mobility (number of valid moves)
+        - Penalize pieces that are under attack
+        Term weights come from self.weights (DEFAULT_HEURISTIC_WEIGHTS or tuned heuristic_weights_<heuristic>.json)
+        """
+        #Base material values (same as e0)
+        material_score = self.heuristic_e0(game_state)
+
+        #Position & mobility score (weighted sum of e1 terms)
+        terms = self.heuristic_terms(game_state)
+        weights = self.weights
+        positional_score = sum(weights[term] * terms[term] for term in E1_TERMS)
+
+        #combine material and positional scores
+        return material_score + positional_score
+
+    def heuristic_e2(self, game_state):
+        """
+        Advanced heuristic e2: Builds on e1 and adds strategic factors:
+        - King safety (penalize exposed kings)
+        - Piece coordination (bonus for pieces protecting each other)
+        - Pawn structure (bonus for connected pawns)
+        - Control of central squares
+        - Bonus for having the initiative (having the move is an advantage)
+        """
+        #Material (same as e0)
+        material_score = self.heuristic_e0(game_state)
+
+        #e1 terms (position, mobility, attacks) + strategic terms, computed in one pass
+        terms = self.heuristic_terms(game_state, strategic=True)
+        weights = self.weights
+        base_score = material_score + sum(weights[term] * terms[term] for term in E1_TERMS)
+        strategic_score = sum(weights[term] * terms[term] for term in E2_TERMS)
+
+        return base_score + strategic_score
+
+    def heuristic_terms(self, game_state, strategic=False):
+        """
+        Helper method: unweighted positional terms of heuristics e1 (and e2 if strategic=True)
+        Returns dictionary {term name -> White total - Black total} (see E1_TERMS / E2_TERMS)
+        Used by heuristic_e1/e2 and by Tuner.py to extract feature vectors
+        """
+        terms = {term: 0 for term in E1_TERMS}
+        if strategic:
+            terms.update({term: 0 for term in E2_TERMS})
+
+        #Get all attacked positions on board (the SEE attack penalty doesn't need them, only the strategic terms do)
+        use_see = self.attack_term == "see"
+        attacks = self.get_attacked_positions(game_state) if strategic or not use_see else {}
+        see_attacks = self.attack_map(game_state["board"]) if use_see else None #attackers of both colors (static exchanges)
+
+        #Evaluate each piece's positional advantage or disadvantage
+        for row in range(5):
+            for col in range(5):
+                piece = game_state["board"][row][col]
+                if piece == '.': #skip empty squares
+                    continue
+
+                color = piece[0]  #'w' or 'b'
+                piece_type = piece[1]  #'p', 'N', 'B', 'Q', 'K'
+                multiplier = 1 if color == 'w' else -1 #positive for white, negative for black
+                position = (row, col)
+
+                #Pawn advancement bonus (closer to promotion = better)
+                if piece_type == 'p':
+                    if color == 'w':
+                        #White pawns move upward, row 0 is best
+                        advancement = 4 - row
+                    else:
+                        #Black pawns move downward, row 4 is best
+                        advancement = row
+                    terms["pawn_advancement"] += advancement * multiplier
+
+                #Center control bonus for Knights and Bishops
+                if piece_type in ['N', 'B']:
+                    #Manhattan distance from center (2,2)
+                    center_distance = abs(row - 2) + abs(col - 2)
+                    terms["center"] += (4 - center_distance) * multiplier #Closer to center = higher bonus
+
+                #Mobility bonus for Queens (higher mobility = stronger position)
+                if piece_type == 'Q':
+                    #count nb of valid moves the Queen can make
+                    queen_moves = len(self.piece_moves(game_state["board"], row * 5 + col, piece, []))
+                    terms["queen_mobility"] += queen_moves * multiplier #reward for having more available moves
+
+                #Penalty for being under attack
+                if use_see: #material the opponent can win on this square
+                    terms["attack_penalty"] -= self.threat_value(game_state, position, see_attacks.get(position, [])) * multiplier
+                elif position in attacks: #if this position is under attack
+                    for attacker in attacks[position]:
+                        attacker_piece = game_state["board"][attacker[0]][attacker[1]]
+                        #If attacker belongs to opponent
+                        if attacker_piece[0] != color:
+                            terms["attack_penalty"] -= ATTACK_VALUES[piece_type] * multiplier #Higher penalty for more valuable pieces
+
+        if not strategic:
+            return terms
+
+        defenses = self.get_defended_positions(game_state, attacks)
+
+        # ------------------------------------ 1. Central Control Bonus --------------------------------------
+        central_squares = [(1, 1), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3), (3, 1), (3, 2), (3, 3)]
+
+        #Evaluate control over central squares
+        for square in central_squares:
+            #Count attackers of each color for this square
+            white_attackers = sum(1 for pos in attacks.get(square, []) if game_state["board"][pos[0]][pos[1]][0] == 'w')
+            black_attackers = sum(1 for pos in attacks.get(square, []) if game_state["board"][pos[0]][pos[1]][0] == 'b')
+
+            #Award points for controlling central squares for the side with more attackers
+            if white_attackers > black_attackers:
+                terms["central_control"] += 1
+            elif black_attackers > white_attackers:
+                terms["central_control"] -= 1
+
+        for row in range(5):
+            for col in range(5):
+                piece = game_state["board"][row][col]
+                if piece == '.':
+                    continue
+                
+                color = piece[0]  #'w' or 'b'
+                piece_type = piece[1]  #'p', 'N', 'B', 'Q', 'K'
+                multiplier = 1 if color == 'w' else -1
+                position = (row, col)
+                
+                # --------------------------------------- 2. King Safety ---------------------------------------------
+                if piece_type == 'K':
+                    #Count enemy attacks in king zone
+                    enemy_attacks = 0
+                    for r in range(max(0, row-1), min(5, row+2)):
+                        for c in range(max(0, col-1), min(5, col+2)):
+                            for attacker_pos in attacks.get((r, c), []):
+                                attacker = game_state["board"][attacker_pos[0]][attacker_pos[1]]
+                                if attacker[0] != color:
+                                    enemy_attacks += 1
+                    terms["king_safety"] -= enemy_attacks * multiplier #Higher penalty for more enemy attacks near the king
+                
+                # ------------------ 3. Piece Coordination (Defended Pieces Bonus) ---------------------------
+                if position in defenses:
+                    terms["coordination"] += len(defenses[position]) * multiplier #defenders are always friendly pieces
+                
+                # -------------------- 4. Pawn Structure (Connected Pawns Bonus) -----------------------------
+                if piece_type == 'p':
+                    #Check for adjacent pawns of same color
+                    for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
+                        r, c = row + dr, col + dc
+                        if 0 <= r < 5 and 0 <= c < 5:
+                            adj_piece = game_state["board"][r][c]
+                            if adj_piece != '.' and adj_piece[0] == color and adj_piece[1] == 'p':
+                                terms["pawn_structure"] += multiplier
+        
+        # -------------------- 5. Initiative Bonus (Having the Move) -----------------------------
+        terms["initiative"] = 1 if game_state["turn"] == 'white' else -1
+        
+        return terms
+
+    """
+    Find the pieces of a color attacking a square (only the board is read)
+    Sliders are found by walking each ray up to the first piece, so removing a capturer uncovers the pieces behind it (x-rays)
+
+    Args:
+        - board:    list | 5x5 board
+        - square:   tuple | (row, col) of the attacked square
+        - color:    'w' or 'b'
+    Returns:
+        - attackers:    list | positions (row, col) of the attacking pieces
+    """
+    def attackers_of(self, board, square, color):
+        row, col = square
+        attackers = []
+
+        #Sliders (Queen on lines & diagonals, Bishop on diagonals) and King (1 step)
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)):
+            r, c = row + dr, col + dc
+            distance = 1
+            while 0 <= r < 5 and 0 <= c < 5:
+                piece = board[r][c]
+                if piece != '.':
+                    if piece[0] == color:
+                        piece_type = piece[1]
+                        if piece_type == 'Q' or (piece_type == 'B' and dr != 0 and dc != 0) or (piece_type == 'K' and distance == 1):
+                            attackers.append((r, c))
+                    break
+                r += dr
+                c += dc
+                distance += 1
+
+        #Knights
+        for dr, dc in ((-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2)):
+            r, c = row + dr, col + dc
+            if 0 <= r < 5 and 0 <= c < 5 and board[r][c] == color + 'N':
+                attackers.append((r, c))
+
+        #Pawns (capture diagonally forward: White pawns move up, Black pawns move down)
+        r = row + 1 if color == 'w' else row - 1
+        for c in (col - 1, col + 1):
+            if 0 <= r < 5 and 0 <= c < 5 and board[r][c] == color + 'p':
+                attackers.append((r, c))
+
+        return attackers
+
+    ###Slider uncovered on a line through `square` when the piece on `start` leaves it (x-ray attacker), None if none
+    def xray_attacker(self, board, square, start):
+        row_diff, col_diff = start[0] - square[0], start[1] - square[1]
+        if row_diff != 0 and col_diff != 0 and abs(row_diff) != abs(col_diff): #Knight jump: nothing behind it
+            return None
+        dr = (row_diff > 0) - (row_diff < 0)
+        dc = (col_diff > 0) - (col_diff < 0)
+        r, c = start[0] + dr, start[1] + dc
+        while 0 <= r < 5 and 0 <= c < 5:
+            piece = board[r][c]
+            if piece != '.':
+                if piece[1] == 'Q' or (piece[1] == 'B' and dr != 0 and dc != 0):
+                    return (r, c)
+                return None
+            r += dr
+            c += dc
+        return None
+
+    """
+    Capture sequence on a square: both sides capture with their least valuable attacker (x-rays included)
+    and may stop when continuing loses material, the exchange stops once a King is captured (game over)
+    Attackers of both colors are found once and kept sorted by value, pieces are removed from the board in place and restored
+
+    Args:
+        - board:    list | 5x5 board (unchanged when the function returns)
+        - square:   tuple | (row, col) of the piece captured first
+        - side:     'w' or 'b' | color making the first capture
+        - values:   dictionary | piece type -> value
+        - start:    tuple | (row, col) of the first capturer, None -> least valuable attacker of side
+        - attackers:    list | positions of the pieces of both colors attacking the square (ex: from attack_map), None -> attackers_of
+    Returns:
+        - gain: material won (+) or lost (-) by side, None if side has no attacker on the square
+    """
+    def exchange(self, board, square, side, values, start=None, attackers=None):
+        end_row, end_col = square
+        if attackers is None:
+            attackers = self.attackers_of(board, square, 'w') + self.attackers_of(board, square, 'b')
+
+        #(value, position) of the attackers of each color, least valuable first
+        sorted_attackers = {'w': [], 'b': []}
+        for row, col in attackers:
+            piece = board[row][col]
+            if (row, col) != start:
+                sorted_attackers[piece[0]].append((values[piece[1]], (row, col)))
+        sorted_attackers['w'].sort()
+        sorted_attackers['b'].sort()
+        if start is None:
+            if not sorted_attackers[side]:
+                return None
+            start = sorted_attackers[side].pop(0)[1]
+
+        removed = [] #(position, piece) taken off the board during the exchange
+        gain = [values[board[end_row][end_col][1]]] #gain[i] = material won by the side making capture i if the exchange stops after it
+        king_taken = board[end_row][end_col][1] == 'K'
+        while True:
+            #Capturer leaves its square (may uncover a slider behind it)
+            piece = board[start[0]][start[1]]
+            removed.append((start, piece))
+            board[start[0]][start[1]] = '.'
+            if king_taken:
+                break
+            xray = self.xray_attacker(board, square, start)
+            if xray is not None:
+                uncovered = board[xray[0]][xray[1]]
+                insort(sorted_attackers[uncovered[0]], (values[uncovered[1]], xray))
+
+            #Pawn reaching the last row is promoted to a Queen
+            if piece[1] == 'p' and end_row == (0 if piece[0] == 'w' else 4):
+                gain[-1] += values['Q'] - values['p']
+                piece = piece[0] + 'Q'
+
+            side = 'b' if side == 'w' else 'w'
+            if not sorted_attackers[side]:
+                break
+            start = sorted_attackers[side].pop(0)[1] #least valuable attacker recaptures
+            gain.append(values[piece[1]] - gain[-1])
+            king_taken = piece[1] == 'K'
+
+        for (row, col), piece in removed:
+            board[row][col] = piece
+
+        #Each side only continues the exchange if it doesn't lose material (negamax from the end of the sequence)
+        for i in range(len(gain) - 1, 0, -1):
+            gain[i - 1] = -max(-gain[i - 1], gain[i])
+        return gain[0]
+
+    """
+    Static exchange evaluation: material balance of the full capture sequence started by a capture (see exchange)
+
+    Args:
+        - game_state:   dictionary | Dictionary representing the current game state
+        - move:         int | packed capture move
+        - values:       dictionary | piece type -> value (default PIECE_VALUES)
+    Returns:
+        - gain: material won (+) or lost (-) by the side making the capture
+    """
+    def static_exchange(self, game_state, move, values=PIECE_VALUES):
+        board = game_state["board"]
+        start = SQUARE_ROW_COL[move_start(move)]
+        end = SQUARE_ROW_COL[move_end(move)]
+        if board[end[0]][end[1]] == '.':
+            return 0
+        return self.exchange(board, end, board[start[0]][start[1]][0], values, start)
+
+    ###Material the opponent wins by capturing the piece on a square (one exchange started by its least valuable attacker, 0 if not winning)
+    #attackers: pieces of both colors attacking the square (from attack_map), None -> found on the board
+    def threat_value(self, game_state, square, attackers=None):
+        board = game_state["board"]
+        enemy = 'b' if board[square[0]][square[1]][0] == 'w' else 'w'
+        if attackers is not None:
+            enemies = [pos for pos in attackers if board[pos[0]][pos[1]][0] == enemy]
+            if not enemies: #not attacked
+                return 0
+            if len(enemies) == len(attackers): #undefended: the least valuable attacker takes it unless its capture uncovers a defender
+                start = min(enemies, key=lambda pos: ATTACK_VALUES[board[pos[0]][pos[1]][1]])
+                xray = self.xray_attacker(board, square, start)
+                if xray is None or board[xray[0]][xray[1]][0] == enemy:
+                    capturer = board[start[0]][start[1]]
+                    promoted = capturer[1] == 'p' and square[0] == (0 if enemy == 'w' else 4)
+                    return ATTACK_VALUES[board[square[0]][square[1]][1]] + (ATTACK_VALUES['Q'] - ATTACK_VALUES['p'] if promoted else 0)
+        gain = self.exchange(board, square, enemy, ATTACK_VALUES, attackers=attackers)
+        return gain if gain is not None and gain > 0 else 0
+
+    ###Pieces attacking each square, both colors (friendly pieces included: defenders), Returns dictionary (row, col) -> list of attacker positions
+    def attack_map(self, board):
+        attacks = {}
+        for square in range(25):
+            row, col = SQUARE_ROW_COL[square]
+            piece = board[row][col]
+            if piece == '.':
+                continue
+            color, piece_type = piece
+            if piece_type == 'N' or piece_type == 'K':
+                targets = (KNIGHT_TARGETS if piece_type == 'N' else KING_TARGETS)[square]
+            elif piece_type == 'Q' or piece_type == 'B':
+                targets = []
+                for ray in (QUEEN_RAYS if piece_type == 'Q' else BISHOP_RAYS)[square]:
+                    for end in ray: #slide up to the first piece (included)
+                        targets.append(end)
+                        end_row, end_col = SQUARE_ROW_COL[end]
+                        if board[end_row][end_col] != '.':
+                            break
+            else: #Pawns attack diagonally forward
+                end_row = row - 1 if color == 'w' else row + 1
+                targets = [end_row * 5 + col + dc for dc in (-1, 1) if 0 <= end_row < 5 and 0 <= col + dc < 5]
+            for end in targets:
+                attacks.setdefault(SQUARE_ROW_COL[end], []).append((row, col))
+        return attacks
+
+    def get_attacked_positions(self, game_state):
+        """
+        Helper method: find all positions that are under attack
+        Returns dictionary mapping positions to lists of attacker positions {Keys -> Attacked positions | Values -> list of attacker positions}
+        """
+        attacks = {}
+        board = game_state["board"]
+
+        #Loop through every board square: every valid move of a piece (either color) attacks its target square
+        moves = [] #reused move list
+        for square in range(25):
+            row, col = SQUARE_ROW_COL[square]
+            piece = board[row][col]
+            if piece != '.':
+                moves.clear()
+                for move in self.piece_moves(board, square, piece, moves):
+                    attacked_pos = SQUARE_ROW_COL[move % 25] #store attacked position
+                    if attacked_pos not in attacks:
+                        attacks[attacked_pos] = []
+                    attacks[attacked_pos].append((row, col)) #store attacker position
+
+        return attacks
+
+    def get_defended_positions(self, game_state, attacks=None):
+        """
+        Helper method: find all positions that are defended by friendly pieces
+        Returns dictionary mapping positions to lists of defender positions
+        attacks: result of get_attacked_positions if already computed (avoids recomputing it)
+        """
+        defenses = {}
+        if attacks is None:
+            attacks = self.get_attacked_positions(game_state) #find all positions that are under attack (helps determine if piece is attacked by a friendly piece (defended))
+        
+        #Check if pieces are defended (attacked by friendly pieces)
+        for row in range(5):
+            for col in range(5):
+                piece = game_state["board"][row][col]
+                if piece == '.':
+                    continue
+                
+                color = piece[0]
+                position = (row, col)
+                
+                #identify friendly defenders
+                if position in attacks:
+                    defenders = []
+                    for attacker_pos in attacks[position]:
+                        attacker = game_state["board"][attacker_pos[0]][attacker_pos[1]]
+                        if attacker[0] == color: #Same color = defender
+                            defenders.append(attacker_pos)
+                    
+                    #Store defended pieces
+                    if defenders:
+                        defenses[position] = defenders
+        
+        return defenses
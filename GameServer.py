@@ -0,0 +1,414 @@
+#Asyncio game server: many human vs AI games hosted by one process
+#Protocol: one JSON object per line over local TCP or a Unix socket, each request gets one JSON response line
+#AI searches run in a bounded process pool (the event loop only parses requests and applies moves),
+#with each game's AI timeout, queue depth and latency metrics available through the "metrics" command
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from AI import AI
+from Engine import MiniChessEngine, position_key
+from Moves import move_to_string, parse_move
+from Telemetry import json_score
+
+MODES = {"H-AI", "AI-H"} #human plays White | AI plays White
+SEARCH_GRACE = 1.0 #extra seconds given to a worker beyond the game's AI timeout (process start, transfer)
+LATENCY_SAMPLES = 1000 #recent samples kept for latency percentiles
+
+_worker_ais = {} #(heuristic, alpha-beta, max depth) -> AI kept in a worker process (caches reused between requests)
+
+###JSON integer (bool is a subclass of int in Python but true/false are not accepted as numbers)
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+###Search the best move in a worker process (Returns move, score, search time, states explored)
+#The timeout is set per request: it is free-form client input, one AI per distinct timeout would never be evicted
+def search_move(settings, game_state, history, unchanged_turns):
+    heuristic, timeout, use_alpha_beta, max_depth = settings
+    ai = _worker_ais.get((heuristic, use_alpha_beta, max_depth))
+    if ai is None:
+        game = MiniChessEngine(heuristic, timeout, use_alpha_beta)
+        ai = _worker_ais[(heuristic, use_alpha_beta, max_depth)] = AI(game, game.heuristic_func, max_depth)
+    ai.game.timeout = timeout
+    ai.max_time = timeout - 0.01 #same buffer as AI.__init__
+    move, score, elapsed, explored, _ = ai.get_move(game_state, history, unchanged_turns)
+    return move, score, elapsed, explored
+
+class ServerGame:
+    ###One game hosted by the server (same rules and counters as MiniChess.play)
+    def __init__(self, game_id, mode="H-AI", heuristic="e2", timeout=5, use_alpha_beta=True, max_turns=100, max_depth=3):
+        self.id = game_id
+        self.mode = mode
+        self.rules = MiniChessEngine(heuristic, timeout, use_alpha_beta, max_turns) #move validation, make_move, game_result
+        self.settings = (heuristic, timeout, use_alpha_beta, max_depth) #AI settings sent to the workers
+        self.timeout = timeout
+        self.ai_color = "black" if mode == "H-AI" else "white"
+        self.game_state = self.rules.init_board()
+        self.unchanged_turns = 0 #plies since the last capture
+        self.turn_count = 1 #full turns (incremented after Black has moved)
+        self.history = [position_key(self.game_state)] #position keys since the last capture (repetitions in AI search)
+        self.moves = [] #moves played ("B2 B3")
+        self.result = None #"white" | "black" | "draw" once the game is over
+        self.lock = asyncio.Lock() #one request at a time per game
+
+    def is_ai_turn(self):
+        return self.result is None and self.game_state["turn"] == self.ai_color
+
+    ###Play a packed move and update the draw counters and result
+    def play(self, move):
+        if self.game_state["turn"] == "black":
+            self.turn_count += 1
+        self.game_state, self.unchanged_turns, self.history = self.rules.play_move(self.game_state, move, self.unchanged_turns, self.history)
+        self.moves.append(move_to_string(move))
+        self.result = self.rules.game_result(self.game_state, self.unchanged_turns, self.turn_count)
+
+    def to_dict(self):
+        return {
+            "game": self.id,
+            "mode": self.mode,
+            "board": self.game_state["board"],
+            "turn": self.game_state["turn"],
+            "turn_count": self.turn_count,
+            "unchanged_turns": self.unchanged_turns,
+            "moves": self.moves,
+            "result": self.result,
+        }
+
+class RequestError(Exception):
+    ###Invalid request (sent back to the client as {"ok": false, "error": message})
+    pass
+
+class ServerMetrics:
+    ###Request/search counters and recent latencies
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.searches = 0
+        self.timeouts = 0 #searches that exceeded the game's AI timeout (+ grace)
+        self.rejected = 0 #searches refused because the queue was full
+        self.max_queue_depth = 0
+        self.request_latency = collections.deque(maxlen=LATENCY_SAMPLES) #seconds from request received to response
+        self.search_latency = collections.deque(maxlen=LATENCY_SAMPLES) #seconds from search queued to result
+        self.queue_wait = collections.deque(maxlen=LATENCY_SAMPLES) #seconds a search waited for a free worker
+
+    ###Mean / median / 95th percentile of latency samples in milliseconds (None if no samples)
+    @staticmethod
+    def latency_stats(samples):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return {
+            "mean_ms": 1000 * sum(ordered) / len(ordered),
+            "p50_ms": 1000 * ordered[len(ordered) // 2],
+            "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        }
+
+class GameServer:
+    """
+    Host many games in one process
+
+    Args:
+        - workers:      size of the AI process pool (max searches running at once)
+        - max_queue:    max searches waiting for a free worker (more -> request refused with "server busy")
+        - max_games:    max games held in memory
+        - defaults:     settings of new games when a "new" request doesn't give them
+                        (heuristic, timeout, alpha_beta, max_turns, depth)
+    """
+    def __init__(self, workers=2, max_queue=16, max_games=1000, **defaults):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_games = max_games
+        self.defaults = {"mode": "H-AI", "heuristic": "e2", "timeout": 5, "alpha_beta": True, "max_turns": 100, "depth": 3}
+        self.defaults.update(defaults)
+        self.games = {} #game id -> ServerGame
+        self.game_ids = itertools.count(1)
+        self.metrics = ServerMetrics()
+        self.pool = None
+        self.server = None
+        self.worker_slots = None #semaphore: one slot per worker process
+        self.queued = 0 #searches waiting for a free worker
+        self.running = 0 #searches running in the pool
+        self.connections = set() #connection handler tasks (stopped by close)
+
+    ###Start listening on local TCP (host, port; port 0 -> any free port) or on a Unix socket (path)
+    #Returns the address ((host, port) or path)
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.worker_slots = asyncio.Semaphore(self.workers)
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=path)
+            return path
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for task in list(self.connections):
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    ###Read request lines from one client until it disconnects (the games it created are then removed)
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        own_games = set() #ids of the games created by this client
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handle_line(line, own_games)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError): #client gone or server closing
+            pass
+        finally:
+            self.connections.discard(task)
+            for game_id in own_games:
+                self.games.pop(game_id, None)
+            writer.close()
+
+    ###Parse and run one request line (Returns the response dictionary)
+    #own_games: ids of the games created by the client (new games are added to it)
+    async def handle_line(self, line, own_games=None):
+        start = time.perf_counter()
+        self.metrics.requests += 1
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("request must be a JSON object")
+            response = await self.handle_request(request, own_games)
+            response["ok"] = True
+        except (RequestError, ValueError) as error:
+            self.metrics.errors += 1
+            response = {"ok": False, "error": str(error)}
+        except Exception as error: #unexpected failure (ex: crashed worker pool): answered, the connection stays open
+            self.metrics.errors += 1
+            response = {"ok": False, "error": f"internal error: {type(error).__name__}: {error}"}
+        if isinstance(request, dict) and "id" in request: #echo the client's request id
+            response["id"] = request["id"]
+        self.metrics.request_latency.append(time.perf_counter() - start)
+        return response
+
+    ###Commands: new, move, ai, state, close, metrics, ping
+    #Game commands only reach the games created by the same client (own_games, None -> any game)
+    async def handle_request(self, request, own_games=None):
+        command = request.get("cmd")
+        if command == "ping":
+            return {}
+        if command == "metrics":
+            return {"metrics": self.metrics_snapshot()}
+        if command == "new":
+            return await self.new_game(request, own_games)
+        game_id = request.get("game")
+        if not is_integer(game_id):
+            raise RequestError("game must be an integer game id")
+        game = self.games.get(game_id) if own_games is None or game_id in own_games else None
+        if game is None: #other clients' games are reported as unknown
+            raise RequestError(f"unknown game: {game_id}")
+        if command == "state":
+            return game.to_dict()
+        if command == "close":
+            del self.games[game.id]
+            if own_games is not None:
+                own_games.discard(game.id)
+            return {"game": game.id}
+        if command == "move":
+            return await self.human_move(game, request.get("move"))
+        if command == "ai":
+            async with game.lock:
+                ai_move = await self.ai_turn(game)
+                return dict(game.to_dict(), ai_move=ai_move)
+        raise RequestError(f"unknown command: {command}")
+
+    ###Create a game ({"cmd": "new", "mode": "H-AI" | "AI-H", "heuristic", "timeout", "alpha_beta", "max_turns", "depth"})
+    #If the AI plays White, its first move is played before responding, own_games: set the new game id is added to
+    async def new_game(self, request, own_games=None):
+        if len(self.games) >= self.max_games:
+            raise RequestError("too many games")
+        settings = {name: request.get(name, default) for name, default in self.defaults.items()}
+        if settings["mode"] not in MODES:
+            raise RequestError(f"mode must be one of {sorted(MODES)}")
+        if settings["heuristic"] not in ("e0", "e1", "e2"):
+            raise RequestError("heuristic must be e0, e1 or e2")
+        if not (is_integer(settings["timeout"]) or isinstance(settings["timeout"], float)) or not settings["timeout"] > 0:
+            raise RequestError("timeout must be a positive number of seconds")
+        if not isinstance(settings["alpha_beta"], bool):
+            raise RequestError("alpha_beta must be true or false")
+        if not is_integer(settings["max_turns"]) or settings["max_turns"] <= 0:
+            raise RequestError("max_turns must be a positive integer")
+        if not is_integer(settings["depth"]) or not 1 <= settings["depth"] <= 10:
+            raise RequestError("depth must be an integer between 1 and 10")
+
+        game = ServerGame(next(self.game_ids), settings["mode"], settings["heuristic"], settings["timeout"],
+                          settings["alpha_beta"], settings["max_turns"], settings["depth"])
+        self.games[game.id] = game
+        if own_games is not None:
+            own_games.add(game.id)
+        async with game.lock:
+            ai_move = await self.ai_turn(game)
+            return dict(game.to_dict(), ai_move=ai_move)
+
+    ###Play the human's move ("B2 B3"), then the AI reply (Returns game state + ai_move)
+    async def human_move(self, game, text):
+        async with game.lock:
+            if game.result is not None:
+                raise RequestError("game is over")
+            if game.is_ai_turn():
+                raise RequestError("not your turn")
+            move = parse_move(text, game.game_state["board"]) if isinstance(text, str) else None
+            if move is None:
+                raise RequestError("invalid format, use a move like 'B2 B3'")
+            if not game.rules.is_valid_move(game.game_state, move):
+                raise RequestError(f"invalid move: {text}")
+            game.play(move)
+            ai_move = await self.ai_turn(game)
+            return dict(game.to_dict(), ai_move=ai_move)
+
+    ###Let the AI play if it is its turn (Returns {"move", "score", "time", "states_explored"} or None)
+    async def ai_turn(self, game):
+        if not game.is_ai_turn():
+            return None
+        move, score, elapsed, explored = await self.run_search(game)
+        if move is None: #no legal move for the AI
+            game.result = "draw"
+            return None
+        game.play(move)
+        return {"move": move_to_string(move), "score": json_score(score), "time": elapsed, "states_explored": explored}
+
+    ###Run an AI search in the process pool, waiting for a free worker (bounded queue, game timeout)
+    async def run_search(self, game):
+        if self.queued >= self.max_queue:
+            self.metrics.rejected += 1
+            raise RequestError("server busy, try again")
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.queued)
+        try:
+            await self.worker_slots.acquire()
+        finally:
+            self.queued -= 1
+        self.metrics.queue_wait.append(time.perf_counter() - queued_at)
+
+        self.running += 1
+        pool = self.pool
+        job = None
+        try:
+            job = pool.submit(search_move, game.settings, game.game_state, game.history, game.unchanged_turns)
+            #The slot is freed when the job ends: a search that timed out still occupies its worker until then
+            loop = asyncio.get_running_loop()
+            job.add_done_callback(lambda _: loop.call_soon_threadsafe(self.release_worker))
+            result = await asyncio.wait_for(asyncio.wrap_future(job), game.timeout + SEARCH_GRACE)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise RequestError("AI search timed out, send {\"cmd\": \"ai\"} to retry")
+        except BrokenProcessPool: #a worker process died: later searches run in a new pool
+            if self.pool is pool:
+                self.pool = ProcessPoolExecutor(self.workers)
+            raise RequestError("AI worker crashed, send {\"cmd\": \"ai\"} to retry")
+        finally:
+            if job is None: #not submitted
+                self.release_worker()
+        self.metrics.searches += 1
+        self.metrics.search_latency.append(time.perf_counter() - queued_at)
+        return result
+
+    ###Free the worker slot of a search job once it has ended
+    def release_worker(self):
+        self.running -= 1
+        self.worker_slots.release()
+
+    ###Current counters, queue depth and latencies
+    def metrics_snapshot(self):
+        metrics = self.metrics
+        return {
+            "games": len(self.games),
+            "queue_depth": self.queued,
+            "running_searches": self.running,
+            "workers": self.workers,
+            "max_queue_depth": metrics.max_queue_depth,
+            "requests": metrics.requests,
+            "errors": metrics.errors,
+            "searches": metrics.searches,
+            "timeouts": metrics.timeouts,
+            "rejected": metrics.rejected,
+            "request_latency": metrics.latency_stats(metrics.request_latency),
+            "search_latency": metrics.latency_stats(metrics.search_latency),
+            "queue_wait": metrics.latency_stats(metrics.queue_wait),
+        }
+
+class GameClient:
+    ###Local client of a GameServer (one request at a time per connection)
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.request_ids = itertools.count(1)
+
+    ###Connect over TCP (host, port) or to a Unix socket (path)
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    ###Send a request (ex: request("move", game=1, move="B2 B3")) and return the response dictionary
+    async def request(self, command, **fields):
+        request = dict(fields, cmd=command, id=next(self.request_ids))
+        self.writer.write((json.dumps(request) + "\n").encode())
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+async def serve(args):
+    server = GameServer(args.workers, args.max_queue, args.max_games, heuristic=args.heuristic, timeout=args.timeout)
+    address = await server.start(args.host, args.port, args.unix)
+    print(f"MiniChess game server listening on {address} ({args.workers} AI workers)")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many human vs AI games over JSON lines (TCP or Unix socket)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4720)
+    parser.add_argument("--unix", default=None, help="Unix socket path (instead of TCP)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="AI search processes")
+    parser.add_argument("--max-queue", type=int, default=64, help="max searches waiting for a worker")
+    parser.add_argument("--max-games", type=int, default=1000)
+    parser.add_argument("--heuristic", choices=["e0", "e1", "e2"], default="e2", help="default heuristic of new games")
+    parser.add_argument("--timeout", type=float, default=5, help="default AI timeout per move of new games (seconds)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
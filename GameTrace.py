@@ -0,0 +1,104 @@
+#Reader for the gameTrace-<b>-<t>-<m>.txt logs written by MiniChess
+#Returns the game parameters, every logged action (move + AI details) and the final result,
+#so tools (ex: Tuner.py) can rebuild positions from the logged moves
+import re
+
+from Moves import pack_move
+
+###Convert a number written by MiniChess.get_ai_stats (ex: 846, 1.2k, 3.4M) back to an int (k/M values are approximate)
+def parse_count(text):
+    text = text.strip()
+    if text.endswith("M"):
+        return int(float(text[:-1]) * 1000000)
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1000)
+    return int(text)
+
+###Convert chess notation (ex: "B2") to board coordinates (row, col)
+def parse_square(text):
+    return (5 - int(text[1]), ord(text[0].upper()) - ord('A'))
+
+###Parse board lines written by MiniChess.board_to_string (ex: "5  bK  bQ  bB  bN   .")
+def parse_board(lines):
+    return [line.split()[1:] for line in lines]
+
+"""
+Parse a game trace file
+
+Args:
+    - path: path of a gameTrace-<b>-<t>-<m>.txt file
+Returns:
+    - trace: dictionary {
+        "params": {"mode", "max_turns", "timeout", "alpha_beta", "heuristic"} (AI params only if an AI played),
+        "initial_board": board (list of rows),
+        "actions": [{"player", "turn", "move" (packed move, see Moves.py), "time", "heuristic_score", "search_score", "board", "states_explored", "states_by_depth"}],
+        "result": "white" | "black" | "draw" | None (game exited/unfinished)
+      }
+"""
+def parse_trace(path):
+    with open(path) as f:
+        lines = f.read().splitlines()
+
+    trace = {"params": {}, "initial_board": None, "actions": [], "result": None}
+    params = trace["params"]
+    action = None #action currently being parsed
+    board = None #board before the action being parsed (promotion flag of the move)
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+
+        #Game parameters
+        if line.startswith("Play mode:"):
+            params["mode"] = line.split(":", 1)[1].strip()
+        elif line.startswith("Max turns:"):
+            params["max_turns"] = int(line.split(":", 1)[1])
+        elif line.startswith("Timeout:"):
+            params["timeout"] = int(line.split(":", 1)[1].split()[0])
+        elif line.startswith("Alpha-beta:"):
+            params["alpha_beta"] = line.split(":", 1)[1].strip() == "True"
+        elif line.startswith("Heuristic:"):
+            params["heuristic"] = line.split(":", 1)[1].strip()
+
+        #Boards (5 rows followed by the column labels)
+        elif line == "Initial Board Configuration:":
+            trace["initial_board"] = board = parse_board(lines[i + 1:i + 6])
+            i += 6
+        elif line == "Updated Board:" and action is not None:
+            action["board"] = parse_board(lines[i + 1:i + 6])
+            if action["move"] is not None:
+                board = action["board"]
+            i += 6
+
+        #Actions
+        elif line.startswith("Player:"):
+            action = {"player": line.split(":", 1)[1].strip().lower(), "turn": None, "move": None, "time": None,
+                      "heuristic_score": None, "search_score": None, "board": None, "states_explored": None, "states_by_depth": {}}
+            trace["actions"].append(action)
+        elif action is not None and line.startswith("Turn #"):
+            action["turn"] = int(line[len("Turn #"):])
+        elif action is not None and line.startswith("Action:"):
+            match = re.search(r"from ([A-E][1-5]) to ([A-E][1-5])", line)
+            action["move"] = pack_move(parse_square(match.group(1)), parse_square(match.group(2)), board)
+        elif action is not None and line.startswith("Time for this action:"):
+            action["time"] = float(line.split(":", 1)[1].split()[0])
+        elif action is not None and line.startswith("Heuristic score:"):
+            action["heuristic_score"] = float(line.split(":", 1)[1])
+        elif action is not None and line.startswith(("Alpha-beta search score:", "Minimax search score:")):
+            action["search_score"] = float(line.split(":", 1)[1])
+        elif action is not None and line.startswith("Cumulative states explored:"):
+            action["states_explored"] = parse_count(line.split(":", 1)[1])
+        elif action is not None and line.startswith("Cumulative states explored by depth:"):
+            for part in line.split(":", 1)[1].split():
+                depth, count = part.split("=")
+                action["states_by_depth"][int(depth)] = parse_count(count)
+
+        #Result
+        elif line.startswith("White Wins!"):
+            trace["result"] = "white"
+        elif line.startswith("Black Wins!"):
+            trace["result"] = "black"
+        elif line.startswith("Game ended in a draw"):
+            trace["result"] = "draw"
+        i += 1
+
+    return trace
@@ -0,0 +1,236 @@
+#Monte Carlo Tree Search engine (alternative to minimax / alpha-beta with the same get_move interface)
+#UCT selection, lightly guided random playouts (king captures are always taken), tree reuse between moves,
+#optional process pool running playout batches in parallel
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from AI import king_winner
+from Engine import NO_CAPTURE_LIMIT, position_key
+from Moves import SQUARE_ROW_COL
+
+PLAYOUT_DEPTH = 40 #max plies of a playout before the position is scored by the heuristic
+PLAYOUT_EVAL_SCALE = 0.5 #heuristic score -> White win probability: sigmoid(scale * score)
+
+_worker_games = {} #(heuristic, attack term) -> engine used by playout worker processes
+
+###King captured by move m? (decisive move, always played in playouts)
+def captures_king(game_state, m):
+    end_row, end_col = SQUARE_ROW_COL[m % 25]
+    return game_state["board"][end_row][end_col][1:] == 'K'
+
+"""
+Play one random game from a position
+
+Args:
+    - game:            MiniChessEngine | move generation & make_move
+    - game_state:      dictionary | starting position
+    - unchanged_turns: int | plies since the last capture
+    - heuristic:       function scoring cut-off playouts (None -> draw)
+    - rng:             random.Random
+Returns:
+    - White's result: 1 (White wins), 0 (Black wins), 0.5 (draw), or heuristic win probability if cut off
+"""
+def playout(game, game_state, unchanged_turns, heuristic, rng, max_plies=PLAYOUT_DEPTH):
+    for _ in range(max_plies):
+        moves = game.valid_moves(game_state)
+        if not moves:
+            return 0.5
+        move = next((m for m in moves if captures_king(game_state, m)), None)
+        if move is None:
+            move = rng.choice(moves)
+        game_state, unchanged_turns, _ = game.play_move(game_state, move, unchanged_turns, None)
+
+        winner = king_winner(game_state)
+        if winner is not None:
+            return 1.0 if winner == "white" else 0.0
+        if unchanged_turns >= NO_CAPTURE_LIMIT:
+            return 0.5
+    if heuristic is None:
+        return 0.5
+    return 1.0 / (1.0 + math.exp(-PLAYOUT_EVAL_SCALE * heuristic(game_state)))
+
+###Run playouts from a batch of leaves in a worker process with the heuristic settings of the parent engine
+#leaves: list of (game_state, unchanged_turns), count: playouts per leaf (Returns sum of White results of each leaf)
+def playout_batch(args):
+    leaves, (heuristic, attack_term, weights), count, seed = args
+    game = _worker_games.get((heuristic, attack_term))
+    if game is None:
+        from Engine import MiniChessEngine
+        game = _worker_games[(heuristic, attack_term)] = MiniChessEngine(heuristic, attack_term=attack_term)
+    game.weights = weights #weights of the parent engine (tuned weights file or weights set in memory)
+    rng = random.Random(seed)
+    return [sum(playout(game, game_state, unchanged_turns, game.heuristic_func, rng) for _ in range(count))
+            for game_state, unchanged_turns in leaves]
+
+class Node:
+    ###Tree node for one position (value = sum of White results of the playouts through this node)
+    def __init__(self, game, game_state, parent=None, move=None, unchanged_turns=0, key=None, result=None):
+        self.game_state = game_state
+        self.parent = parent
+        self.move = move #move played from parent to reach this node
+        self.unchanged_turns = unchanged_turns
+        self.key = key if key is not None else position_key(game_state)
+        self.result = result #"white" | "black" | "draw" if terminal, else None
+        self.children = []
+        self.untried = [] if result is not None else game.valid_moves(game_state) #moves not expanded yet
+        self.visits = 0
+        self.value = 0.0
+
+    ###Mean result from White's point of view
+    def white_score(self):
+        return self.value / self.visits if self.visits else 0.5
+
+class MCTS:
+    ###Initialize the MCTS player (same constructor arguments as AI, plus MCTS options)
+    def __init__(self, game, heuristic_function=None, max_depth=None, exploration=1.4, iterations=None, workers=0, batch_size=4, leaf_batch=16, seed=None):
+        self.game = game #store minichess instance to access game-related functions
+        self.heuristic = heuristic_function #scores playouts cut off after PLAYOUT_DEPTH plies (None -> draw)
+        self.exploration = exploration #UCT exploration constant
+        self.iterations = iterations #max nb of tree iterations per move (None -> until timeout)
+        self.max_time = game.timeout - 0.01 #AI move timeout - 10ms buffer
+        self.workers = workers #0 -> playouts in this process | N -> batches of playouts in a pool of N processes
+        self.batch_size = batch_size #playouts per leaf when a pool is used
+        self.leaf_batch = leaf_batch #leaves selected per pool round (one job per worker: fewer round trips than one per leaf)
+        self.rng = random.Random(seed)
+        self.pool = None
+        #Heuristic settings sent to the pool workers (they score playouts with their own engine, e0 | e1 | e2 or None)
+        heuristic_name = heuristic_function.__name__[len("heuristic_"):] if heuristic_function else None
+        self.worker_settings = (heuristic_name, game.attack_term, game.weights)
+        self.root = None #tree kept between moves
+
+        #Stats of the last move (same fields as AI + playout stats)
+        self.states_explored = 0 #nb of tree iterations
+        self.states_by_depth = {} #tree depth of the selected leaves
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+        self.reused_visits = 0 #visits of the subtree reused from the previous move
+
+    ###Determines best move with MCTS within the time limit (same interface and return values as AI.get_move)
+    #Returned score is the expected result from White's point of view in [-1, 1]
+    def get_move(self, game_state, history=None, unchanged_turns=0):
+        start_time = time.time()
+        self.states_explored = 0
+        self.states_by_depth = {}
+        self.playouts = 0
+        history = set(history) if history else set()
+
+        self.root = self.reuse_tree(game_state)
+        if self.root is None:
+            self.root = Node(self.game, game_state, unchanged_turns=unchanged_turns)
+        self.reused_visits = self.root.visits
+
+        while (time.time() - start_time) < self.max_time and (self.iterations is None or self.states_explored < self.iterations):
+            if not self.root.untried and not self.root.children: #no legal moves
+                break
+            if self.workers > 0:
+                leaves = self.leaf_batch if self.iterations is None else min(self.leaf_batch, self.iterations - self.states_explored)
+                self.simulate_batch(history, leaves)
+                continue
+            leaf, depth = self.select_and_expand(history)
+            value, count = self.simulate(leaf)
+            self.backpropagate(leaf, value, count)
+            self.states_explored += 1
+            self.states_by_depth[depth] = self.states_by_depth.get(depth, 0) + 1
+
+        elapsed = time.time() - start_time
+        self.playouts_per_second = self.playouts / elapsed if elapsed > 0 else 0.0
+
+        if not self.root.children:
+            moves = self.game.valid_moves(game_state)
+            return (moves[0] if moves else None), 0.0, elapsed, self.states_explored, self.states_by_depth
+        best = max(self.root.children, key=lambda child: child.visits) #most visited child (robust choice)
+        return best.move, 2 * best.white_score() - 1, elapsed, self.states_explored, self.states_by_depth
+
+    ###Find the position in the tree kept from the previous move (our move + opponent reply), None if not found
+    #Terminal nodes are skipped: a repetition ends the search there but not the real game
+    def reuse_tree(self, game_state):
+        if self.root is None:
+            return None
+        key = position_key(game_state)
+        frontier = [self.root]
+        for _ in range(3): #root, our moves, opponent replies
+            for node in frontier:
+                if node.key == key and node.game_state == game_state and node.result is None:
+                    node.parent = None #detach subtree (rest of the old tree is freed)
+                    node.move = None
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+        return None
+
+    ###UCT value of a child for the player choosing at its parent
+    def uct(self, parent, child, white_to_move):
+        score = child.white_score() if white_to_move else 1 - child.white_score()
+        return score + self.exploration * math.sqrt(math.log(parent.visits) / child.visits)
+
+    ###Selection (UCT) down to a node with untried moves, then expansion of one move (Returns leaf, depth)
+    def select_and_expand(self, history):
+        node = self.root
+        depth = 0
+        path_keys = set(history)
+        while node.result is None and not node.untried and node.children:
+            path_keys.add(node.key)
+            white_to_move = node.game_state["turn"] == "white"
+            node = max(node.children, key=lambda child: self.uct(node, child, white_to_move))
+            depth += 1
+
+        if node.result is None and node.untried:
+            path_keys.add(node.key)
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            new_state, unchanged_turns, (key,) = self.game.play_move(node.game_state, move, node.unchanged_turns, [])
+
+            #Terminal positions (same rules as the game + repetitions, like the alpha-beta search)
+            result = king_winner(new_state)
+            if result is None and (unchanged_turns >= NO_CAPTURE_LIMIT or key in path_keys):
+                result = "draw"
+            child = Node(self.game, new_state, node, move, unchanged_turns, key, result)
+            node.children.append(child)
+            node = child
+            depth += 1
+        return node, depth
+
+    ###Playout from a leaf in this process (Returns sum of White results, nb of results)
+    def simulate(self, node):
+        if node.result is not None:
+            return {"white": 1.0, "black": 0.0, "draw": 0.5}[node.result], 1
+        self.playouts += 1
+        return playout(self.game, node.game_state, node.unchanged_turns, self.heuristic, self.rng), 1
+
+    ###Pool round: select up to count leaves, then run batch_size playouts from each, one job per worker
+    #Selected leaves count as draws until their results come back (virtual visits), so later selections spread out
+    def simulate_batch(self, history, count):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+        leaves = []
+        for _ in range(count):
+            leaf, depth = self.select_and_expand(history)
+            self.states_explored += 1
+            self.states_by_depth[depth] = self.states_by_depth.get(depth, 0) + 1
+            if leaf.result is not None:
+                value, visits = self.simulate(leaf)
+                self.backpropagate(leaf, value, visits)
+            else:
+                self.backpropagate(leaf, 0.5 * self.batch_size, self.batch_size)
+                leaves.append(leaf)
+
+        groups = [group for group in (leaves[i::self.workers] for i in range(self.workers)) if group]
+        jobs = [([(leaf.game_state, leaf.unchanged_turns) for leaf in group], self.worker_settings, self.batch_size, self.rng.getrandbits(32))
+                for group in groups]
+        for group, values in zip(groups, self.pool.map(playout_batch, jobs)):
+            for leaf, value in zip(group, values):
+                self.backpropagate(leaf, value - 0.5 * self.batch_size, 0) #replace the virtual draws by the results
+        self.playouts += len(leaves) * self.batch_size
+
+    ###Add playout results to every node from the leaf up to the root
+    def backpropagate(self, node, value, count):
+        while node is not None:
+            node.visits += count
+            node.value += value
+            node = node.parent
+
+    ###Shut down the playout process pool
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
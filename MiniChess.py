@@ -3,8 +3,12 @@ from collections import defaultdict
 
 #Import AI
 from AI import AI
+from Engine import NO_CAPTURE_LIMIT, MiniChessEngine, position_key
+from Moves import move_end, move_start, parse_move, square_name
+from Telemetry import SearchTelemetry
 
-class MiniChess:
+#Interactive game: console prompts, game trace log, board display and game loop (rules and evaluation in Engine.py)
+class MiniChess(MiniChessEngine):
     def __init__(self):
         #1) Ask for play mode
         valid_modes = {"H-H", "H-AI", "AI-H", "AI-AI"}
@@ -24,6 +28,7 @@ class MiniChess:
             self.max_turns = 999 #No limit in H vs H games
             self.timeout = "X" #No AI in H vs H games
             self.use_alpha_beta = False #No AI in H vs H games
+            self.heuristic_name = None #No AI in H vs H games
         else:
             #a) Ask for max turns
             while True:
@@ -62,28 +67,28 @@ class MiniChess:
                 heuristic_str = input("Enter heuristic (e0, e1, e2): ").strip().lower()
                 if heuristic_str in {"e0", "e1", "e2"}:
                     self.heuristic_name = heuristic_str #store heuristic choice
-                    #assign corresponding heuristic function
-                    if heuristic_str == "e0":
-                        self.heuristic_func = self.heuristic_e0
-                    elif heuristic_str == "e1":
-                        self.heuristic_func = self.heuristic_e1
-                    else:
-                        self.heuristic_func = self.heuristic_e2
                     break
                 print("Invalid choice. Valid heuristics: e0, e1, e2.\n")
         
+        #Rules & evaluation settings (assigns the heuristic function of the chosen heuristic)
+        super().__init__(self.heuristic_name, self.timeout, self.use_alpha_beta, self.max_turns)
+
         #Initialize game state
         self.current_game_state = self.init_board() #Create inital board setup
         self.unchanged_turns = 0 #Counter consecutive turns with no piece capture (for draw detection)
         self.last_piece_count = 12 #Stores previous turn's piece count (start with 12 pieces)
         self.turn_count = 1 #Keeps track of turn nb (full turns)
+        self.position_history = [position_key(self.current_game_state)] #Position keys reached since the last capture (repetition detection in AI search)
 
         #stats for AI
         self.states_explored = 0 #Counter of states evaluated by AI
         self.states_by_depth = defaultdict(int) #Dictionary to track states explored at each depth
+        self.ai_players = {} #AI player of each color (kept between moves so its caches are reused)
+        self.telemetry = SearchTelemetry() #Per move / per iteration AI search stats
 
         #Create log file name based on parameters
         self.log_file = f"gameTrace-{str(self.use_alpha_beta).lower()}-{self.timeout}-{self.max_turns}.txt"
+        self.telemetry.path = self.log_file[:-len(".txt")] + "-telemetry.jsonl" #AI search telemetry (JSON lines) next to the game trace
 
         #Initialize log file with game parameters
         self.initialize_log()
@@ -97,6 +102,7 @@ class MiniChess:
             
             #Log AI-specific info if at least 1 player is AI
             if 'AI' in self.mode:
+                self.telemetry.reset_file()
                 f.write(f"Max turns: {self.max_turns}\n")
                 f.write(f"Timeout: {self.timeout} seconds\n")
                 f.write(f"Alpha-beta: {self.use_alpha_beta}\n")
@@ -107,11 +113,8 @@ class MiniChess:
 
     ###Logs the current game state, including player moves and AI specific details if applicable
     def log_game_state(self, player, move, time_taken=None, heuristic_score=None, search_score=None):
-        #Unpack move coordinates
-        start, end = move
-        
-        #Convert start and end pos to chess notation (ex: start=(4, 0) to A1)
-        move_str = f"Move from {chr(start[1] + ord('A'))}{5 - start[0]} to {chr(end[1] + ord('A'))}{5 - end[0]}"
+        #Convert start and end squares of the packed move to chess notation (ex: square 20 to A1)
+        move_str = f"Move from {square_name(move_start(move))} to {square_name(move_end(move))}"
 
         #Create a string with player & details
         base_entry = [
@@ -198,27 +201,6 @@ class MiniChess:
         board_str = "\n".join(f"{5-i} " + " ".join(piece.rjust(3) for piece in row) for i, row in enumerate(game_state["board"]))
         return board_str + "\n    A   B   C   D   E"
 
-    """
-    Initialize the board
-
-    Args:
-        - None
-    Returns:
-        - state: A dictionary representing the state of the game
-    """
-    def init_board(self):
-        state = {
-            "board": [
-                ['bK', 'bQ', 'bB', 'bN', '.'],
-                ['.', '.', 'bp', 'bp', '.'],
-                ['.', '.', '.', '.', '.'],
-                ['.', 'wp', 'wp', '.', '.'],
-                ['.', 'wN', 'wB', 'wQ', 'wK']
-            ],
-            "turn": 'white'
-        }
-        return state
-
     """
     Prints the board
     
@@ -236,198 +218,28 @@ class MiniChess:
         print()
 
     """
-    Check if the move is valid    
-    
-    Args: 
-        - game_state:   dictionary | Dictionary representing the current game state
-        - move          tuple | the move which we check the validity of ((start_row, start_col),(end_row, end_col))
-    Returns:
-        - boolean representing the validity of the move
-    """
-    def is_valid_move(self, game_state, move):
-        #Unpack move into start and end positions
-        start, end = move
-        start_row, start_col = start
-        end_row, end_col = end
-
-        #Check if start/end position is within bounds
-        if not (0 <= start_row < 5 and 0 <= start_col < 5):
-            return False
-        if not (0 <= end_row < 5 and 0 <= end_col < 5):
-            return False
-
-        #Identify piece at start/end pos
-        piece = game_state["board"][start_row][start_col]
-        target_piece = game_state["board"][end_row][end_col]
-
-        #Check if start square has a piece
-        if piece == '.':
-            return False
-
-        #Check if piece belongs to current player
-        if piece[0] != game_state["turn"][0]: #'w' for white, 'b' for black
-            return False
-
-        #Check if target square is occupied by player's own piece
-        if target_piece != '.' and target_piece[0] == piece[0]:
-            return False
-
-        #Extract piece type
-        piece_type = piece[1]
-
-        #Calculate row and col diff between start/end 
-        row_diff = abs(end_row - start_row)
-        col_diff = abs(end_col - start_col)
-
-        if piece_type == 'K': #King
-            if row_diff > 1 or col_diff > 1: #King can move 1 square in any direction
-                return False
-        elif piece_type == 'Q': #Queen
-            if row_diff != 0 and col_diff != 0 and row_diff != col_diff: #Queen moves straight & diagonal: if row & col != 0 -> both need ==
-                return False
-            #Check for obstructions in path
-            if not self.is_path_clear(game_state, start, end):
-                return False
-        elif piece_type == 'B': #Bishop
-            if row_diff != col_diff: #Bishop moves diagonal: row == col
-                return False
-            #Check for obstructions in path
-            if not self.is_path_clear(game_state, start, end):
-                return False
-        elif piece_type == 'N': #Knight
-            if not ((row_diff == 2 and col_diff == 1) or (row_diff == 1 and col_diff == 2)): #Knight moves "L"
-                return False
-        elif piece_type == 'p': #Pawn
-            if piece[0] == 'w': #White pawn
-                if end_row >= start_row: #Pawns can only move forward (up: 5 -> 1 == 0 -> 4)
-                    return False
-                if row_diff != 1: #Move 1 row only
-                    return False
-                if col_diff == 0: #Forward move (no capture)
-                    if target_piece != '.': #Forward square must be empty
-                        return False
-                elif col_diff == 1: #Diagonal capture move
-                    if target_piece == '.' or target_piece[0] == 'w': #Must capture opponent's piece
-                        return False
-                else:
-                    return False #Any other movement is invalid
-            else: #Black pawn
-                if end_row <= start_row: #Pawns can only move forward (down: 5 -> 1 == 0 -> 4)
-                    return False
-                if row_diff != 1:
-                    return False
-                if col_diff == 0: 
-                    if target_piece != '.': 
-                        return False
-                elif col_diff == 1:
-                    if target_piece == '.' or target_piece[0] == 'b': 
-                        return False
-                else:
-                    return False #Any other movement is invalid
-        else:
-            return False #Unrecognized piece type
-
-        #if all checks pass, move is valid
-        return True
-
-    ###Check if path between two squares is clear (no pieces blocking the way)
-    def is_path_clear(self, game_state, start, end):
-        start_row, start_col = start
-        end_row, end_col = end
-
-        #Determine direction of movement (step size per row/col)
-        row_step = 1 if end_row > start_row else -1 if end_row < start_row else 0 #(down = 1 | up = -1 | else = 0)
-        col_step = 1 if end_col > start_col else -1 if end_col < start_col else 0 #(right = 1 | left = -1 | else = 0)
-
-        #Check each square along path (excluding start & end squares)
-        current_row, current_col = start_row + row_step, start_col + col_step
-        while (current_row != end_row) or (current_col != end_col):
-            #If any square along path is not empty, return False (path blocked)
-            if game_state["board"][current_row][current_col] != '.':
-                return False  #Path is blocked
-            
-            #Move to next square along path
-            current_row += row_step
-            current_col += col_step
-
-        return True #if loop completes, path is clear
-
-    """
-    Returns a list of valid moves
-
-    Args:
-        - game_state:   dictionary | Dictionary representing the current game state
-    Returns:
-        - valid moves:   list | A list of nested tuples corresponding to valid moves [((start_row, start_col),(end_row, end_col)),((start_row, start_col),(end_row, end_col))]
-    """
-    def valid_moves(self, game_state):
-        #return list of all valid moves
-        valid_moves = []
-
-        #Iterate through each square on the board (5x5)
-        for row in range(5):
-            for col in range(5):
-                piece = game_state["board"][row][col]
-
-                #If square contains piece and belongs to current player
-                if piece != '.' and piece[0] == game_state["turn"][0]:
-                    #Generate all possible moves for this piece
-                    for end_row in range(5):
-                        for end_col in range(5):
-                            move = ((row, col), (end_row, end_col)) #Current pos to possible end pos
-
-                            #If move valid, add to list
-                            if self.is_valid_move(game_state, move):
-                                valid_moves.append(move)
-        return valid_moves
-
-    """
-    Modify to board to make a move
+    Play a move of the current game: update the board, turn counter, draw counters and log, end the game on a win/draw
 
     Args: 
-        - game_state:   dictionary | Dictionary representing the current game state
-        - move          tuple | the move to perform ((start_row, start_col),(end_row, end_col))
+        - game_state:       dictionary | Dictionary representing the current game state
+        - move              int | the packed move to perform (see Moves.py)
+        - update_game:      bool | False -> only return the new position (same as MiniChessEngine.make_move)
+        - time_taken, heuristic_score, search_score: AI search details written to the log
     Returns:
         - game_state:   dictionary | Dictionary representing the modified game state
     """
-    #Execute a move, update board, check win/draw conditions, switch turns
     def make_move(self, game_state, move, update_game=True, time_taken=None, heuristic_score=None, search_score=None):
-        #Create deep copy of game state to not modify original (AI needs to evaluate potential moves without changing actual game state)
-        if update_game:
-            new_state = game_state #modify original state
-        else:
-            new_state = copy.deepcopy(game_state) #work on a copy
-        
-        start = move[0] #Starting pos (row, col)
-        end = move[1] #Destination pos (row, col)
-
-        start_row, start_col = start
-        end_row, end_col = end
-        piece = new_state["board"][start_row][start_col] #Get piece being moved
-
-        #Check if move results in pawn promotion
-        if piece[1] == 'p': #if piece is pawn
-            if piece[0] == 'w' and end_row == 0: #White pawn reaches 5th row (row 0 in board array)
-                piece = 'wQ' #Promote to white Queen
-            elif piece[0] == 'b' and end_row == 4: #Black pawn reaches 1st row (row 4 in board array)
-                piece = 'bQ' #Promote to black Queen
-
-        #Update the board
-        new_state["board"][start_row][start_col] = '.' #Clear old pos
-        new_state["board"][end_row][end_col] = piece #Place piece in new pos
-
         #Store current player (for logs)
-        current_player = new_state["turn"]
-
-        #Switch turns/player
-        previous_turn = new_state["turn"]
-        new_state["turn"] = "black" if new_state["turn"] == "white" else "white"
+        current_player = game_state["turn"]
 
-        #Increment `turn_count` only after White & Black have played
-        if update_game and previous_turn == "black": #black just moved, meaning full turn complete
-            self.turn_count += 1
+        #Update the board & switch turns/player (the original state is modified when update_game)
+        new_state = super().make_move(game_state, move, update_game)
 
         if update_game:
+            #Increment `turn_count` only after White & Black have played
+            if current_player == "black": #black just moved, meaning full turn complete
+                self.turn_count += 1
+
             #Count pieces on the board to track game progression
             piece_count = sum(1 for row in new_state["board"] for cell in row if cell != '.')
 
@@ -455,8 +267,13 @@ class MiniChess:
 
             self.last_piece_count = piece_count #Store current piece count for next turn
 
+            #Record position for repetition detection (positions before a capture can never come back)
+            if self.unchanged_turns == 0:
+                self.position_history = []
+            self.position_history.append(position_key(new_state))
+
             #If 10 full turns pass (20 turns) without capture -> draw
-            if self.unchanged_turns >= 20:
+            if self.unchanged_turns >= NO_CAPTURE_LIMIT:
                 #Log move before declaring draw
                 self.log_game_state(current_player, move, time_taken, heuristic_score, search_score)
                 self.display_board(new_state)
@@ -464,7 +281,7 @@ class MiniChess:
                 with open(self.log_file, "a") as f:
                     f.write(f"Game ended in a draw after 10 full turns without piece capture.\n")
                 exit(0)
-            
+
             #If we've reached the maximum number of turns overall -> draw
             if self.turn_count > self.max_turns and current_player == "black": #only check AFTER black has moved on final turn
                 #Log move before declaring draw
@@ -478,322 +295,15 @@ class MiniChess:
         return new_state #return updated game state
 
     """
-    Parse the input string and modify it into board coordinates
+    Parse the input string and modify it into a packed move
 
     Args:
         - move: string representing a move "B2 B3"
     Returns:
-        - (start, end)  tuple | the move to perform ((start_row, start_col),(end_row, end_col))
+        - move  int | the packed move to perform (promotion flag set from the current board), None if invalid format
     """
     def parse_input(self, move):
-        try:
-            start, end = move.split()
-            start = (5-int(start[1]), ord(start[0].upper()) - ord('A'))
-            end = (5-int(end[1]), ord(end[0].upper()) - ord('A'))
-            return (start, end)
-        except:
-            return None
-
-    #Heuristic functions
-    def heuristic_e0(self, game_state):
-        """
-        Basic material-based heuristic e0:
-          Pawn=1, Bishop=3, Knight=3, Queen=9, King=999
-          e0 = (WhiteTotal) - (BlackTotal)
-          positive score favors White, negative score favors Black
-        """
-        #Initialize scores for White and Black
-        white_score = 0
-        black_score = 0
-
-        #Loop through every row of the board
-        for row in game_state["board"]:
-            for cell in row: #Iterate through each cell in the row
-                #Evaluate White pieces
-                if cell == 'wp': #White Pawn
-                    white_score += 1
-                elif cell == 'wB': #White Bishop
-                    white_score += 3
-                elif cell == 'wN': #White Knight
-                    white_score += 3
-                elif cell == 'wQ': #White Queen
-                    white_score += 9
-                elif cell == 'wK': #White King
-                    white_score += 999
-
-                #Evaluate Black pieces
-                elif cell == 'bp': #Black Pawn
-                    black_score += 1
-                elif cell == 'bB': #Black Bishop
-                    black_score += 3
-                elif cell == 'bN': #Black Knight
-                    black_score += 3
-                elif cell == 'bQ': #Black Queen
-                    black_score += 9
-                elif cell == 'bK': #Black King
-                    black_score += 999
-
-        #Compute heuristic value
-        return white_score - black_score
-    
-    def heuristic_e1(self, game_state):
-        """
-        Advanced heuristic e1: Base material values (same as e0) + positional bonuses:
-        - Pawns get bonus for advancement toward promotion
-        - Knights and Bishops get bonus for central positions
-        - Queens get bonus for mobility (number of valid moves)
-        - Penalize pieces that are under attack
-        """
-        #Base material values (same as e0)
-        material_score = self.heuristic_e0(game_state)
-        
-        #Position & mobility score
-        positional_score = 0
-        
-        #Get all attacked positions on board
-        attacks = self.get_attacked_positions(game_state)
-        
-        #Evaluate each piece's positional advantage or disadvantage
-        for row in range(5):
-            for col in range(5):
-                piece = game_state["board"][row][col]
-                if piece == '.': #skip empty squares
-                    continue
-                
-                color = piece[0]  #'w' or 'b'
-                piece_type = piece[1]  #'p', 'N', 'B', 'Q', 'K'
-                multiplier = 1 if color == 'w' else -1 #positive for white, negative for black
-                
-                #Pawn advancement bonus (closer to promotion = better)
-                if piece_type == 'p':
-                    if color == 'w':
-                        #White pawns move upward, row 0 is best
-                        advancement_bonus = (4 - row) * 0.2
-                    else:
-                        #Black pawns move downward, row 4 is best
-                        advancement_bonus = row * 0.2
-                    positional_score += advancement_bonus * multiplier
-                
-                #Center control bonus for Knights and Bishops
-                if piece_type in ['N', 'B']:
-                    #Manhattan distance from center (2,2)
-                    center_distance = abs(row - 2) + abs(col - 2)
-                    center_bonus = (4 - center_distance) * 0.15 #Closer to center = higher bonus
-                    positional_score += center_bonus * multiplier
-                
-                #Mobility bonus for Queens (higher mobility = stronger position)
-                if piece_type == 'Q':
-                    #Temp switch turn to calculate Queen's possible moves
-                    original_turn = game_state["turn"]
-                    temp_state = copy.deepcopy(game_state)
-                    temp_state["turn"] = color #set turn to queen's color
-                    
-                    queen_moves = 0
-                    #count nb of valid moves the Queen can make
-                    for end_row in range(5):
-                        for end_col in range(5):
-                            move = ((row, col), (end_row, end_col))
-                            if self.is_valid_move(temp_state, move):
-                                queen_moves += 1
-                    
-                    mobility_bonus = queen_moves * 0.1 #reward for having more available moves
-                    positional_score += mobility_bonus * multiplier
-                
-                #Penalty for being under attack
-                position = (row, col)
-                if position in attacks: #if this position is under attack
-                    attackers = attacks[position]
-                    for attacker in attackers:
-                        attacker_piece = game_state["board"][attacker[0]][attacker[1]]
-                        #If attacker belongs to opponent
-                        if attacker_piece[0] != color:
-                            piece_value = 1 if piece_type == 'p' else 3 if piece_type in ['N', 'B'] else 9 if piece_type == 'Q' else 20
-                            attack_penalty = piece_value * 0.15 #Higher penalty for more valuable pieces
-                            positional_score -= attack_penalty * multiplier
-        
-        #combine material and positional scores
-        return material_score + positional_score
-
-    def heuristic_e2(self, game_state):
-        """
-        Advanced heuristic e2: Builds on e1 and adds strategic factors:
-        - King safety (penalize exposed kings)
-        - Piece coordination (bonus for pieces protecting each other)
-        - Pawn structure (bonus for connected pawns)
-        - Control of central squares
-        - Bonus for having the initiative (having the move is an advantage)
-        """
-        #Start with e1 evaluation (material, position, mobility bonuses)
-        base_score = self.heuristic_e1(game_state)
-        
-        #Additional strategic considerations
-        strategic_score = 0
-        
-        #Get all attacks and defenses
-        attacks = self.get_attacked_positions(game_state)
-        defenses = self.get_defended_positions(game_state)
-        
-        # ------------------------------------ 1. Central Control Bonus --------------------------------------
-        central_squares = [(1, 1), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3), (3, 1), (3, 2), (3, 3)]
-        white_central_control = 0
-        black_central_control = 0
-        
-        #Evaluate control over central squares
-        for square in central_squares:
-            row, col = square
-            #Count attackers of each color for this square
-            white_attackers = sum(1 for pos in attacks.get(square, []) if game_state["board"][pos[0]][pos[1]][0] == 'w')
-            black_attackers = sum(1 for pos in attacks.get(square, []) if game_state["board"][pos[0]][pos[1]][0] == 'b')
-            
-            #Award points for controlling central squares for the side with more attackers
-            if white_attackers > black_attackers:
-                white_central_control += 0.15
-            elif black_attackers > white_attackers:
-                black_central_control += 0.15
-        
-        strategic_score += white_central_control - black_central_control
-        
-        # --------------------------------------- 2. King Safety ---------------------------------------------
-        for row in range(5):
-            for col in range(5):
-                piece = game_state["board"][row][col]
-                if piece == '.':
-                    continue
-                
-                color = piece[0]  #'w' or 'b'
-                piece_type = piece[1]  #'p', 'N', 'B', 'Q', 'K'
-                multiplier = 1 if color == 'w' else -1
-                position = (row, col)
-                
-                #King safety: Penalize kings that are under attack
-                if piece_type == 'K':
-                    #Count attacks near the king
-                    king_zone = []
-                    for r in range(max(0, row-1), min(5, row+2)):
-                        for c in range(max(0, col-1), min(5, col+2)):
-                            king_zone.append((r, c))
-                    
-                    #Count enemy attacks in king zone
-                    enemy_attacks = 0
-                    for zone_pos in king_zone:
-                        if zone_pos in attacks:
-                            for attacker_pos in attacks[zone_pos]:
-                                attacker = game_state["board"][attacker_pos[0]][attacker_pos[1]]
-                                if attacker[0] != color:
-                                    enemy_attacks += 1
-                    
-                    #Higher penalty for more enemy attacks near the king
-                    king_safety_penalty = enemy_attacks * 0.2
-                    strategic_score -= king_safety_penalty * multiplier
-                
-                # ------------------ 3. Piece Coordination (Defended Pieces Bonus) ---------------------------
-                if position in defenses:
-                    defenders = defenses[position] #get list of pieces defending this position
-                    friendly_defenders = sum(1 for def_pos in defenders if game_state["board"][def_pos[0]][def_pos[1]][0] == color)
-                    coordination_bonus = friendly_defenders * 0.1
-                    strategic_score += coordination_bonus * multiplier
-                
-                # -------------------- 4. Pawn Structure (Connected Pawns Bonus) -----------------------------
-                if piece_type == 'p':
-                    #Check for adjacent pawns of same color
-                    adjacent_pawns = 0
-                    for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                        r, c = row + dr, col + dc
-                        if 0 <= r < 5 and 0 <= c < 5:
-                            adj_piece = game_state["board"][r][c]
-                            if adj_piece != '.' and adj_piece[0] == color and adj_piece[1] == 'p':
-                                adjacent_pawns += 1
-                    
-                    pawn_structure_bonus = adjacent_pawns * 0.15
-                    strategic_score += pawn_structure_bonus * multiplier
-        
-        # -------------------- 5. Initiative Bonus (Having the Move) -----------------------------
-        if game_state["turn"] == 'white':
-            strategic_score += 0.1
-        else:
-            strategic_score -= 0.1
-        
-        return base_score + strategic_score
-
-    def get_attacked_positions(self, game_state):
-        """
-        Helper method: find all positions that are under attack
-        Returns dictionary mapping positions to lists of attacker positions {Keys -> Attacked positions | Values -> list of attacker positions}
-        """
-        attacks = {}
-        
-        #Temp set turn to white to check white attacks
-        temp_state = copy.deepcopy(game_state)
-        temp_state["turn"] = "white"
-        
-        #Loop through every board square (white only)
-        for row in range(5):
-            for col in range(5):
-                piece = game_state["board"][row][col]
-                if piece != '.' and piece[0] == 'w':
-                    #test all possible moves for white
-                    for end_row in range(5):
-                        for end_col in range(5):
-                            move = ((row, col), (end_row, end_col))
-                            #if move is valid
-                            if self.is_valid_move(temp_state, move):
-                                attacked_pos = (end_row, end_col) #store attacked position
-                                if attacked_pos not in attacks:
-                                    attacks[attacked_pos] = []
-                                attacks[attacked_pos].append((row, col)) #store attacker position
-        
-        #Temp set turn to black to check black attacks
-        temp_state["turn"] = "black"
-        
-        #Loop through every board square (black only)
-        for row in range(5):
-            for col in range(5):
-                piece = game_state["board"][row][col]
-                if piece != '.' and piece[0] == 'b':
-                    #test all possible moves for black
-                    for end_row in range(5):
-                        for end_col in range(5):
-                            move = ((row, col), (end_row, end_col))
-                            #if move is valid
-                            if self.is_valid_move(temp_state, move):
-                                attacked_pos = (end_row, end_col) #store attacked position
-                                if attacked_pos not in attacks:
-                                    attacks[attacked_pos] = []
-                                attacks[attacked_pos].append((row, col)) #store attacker position
-        
-        return attacks
-
-    def get_defended_positions(self, game_state):
-        """
-        Helper method: find all positions that are defended by friendly pieces
-        Returns dictionary mapping positions to lists of defender positions
-        """
-        defenses = {}
-        attacks = self.get_attacked_positions(game_state) #find all positions that are under attack (helps determine if piece is attacked by a friendly piece (defended))
-        
-        #Check if pieces are defended (attacked by friendly pieces)
-        for row in range(5):
-            for col in range(5):
-                piece = game_state["board"][row][col]
-                if piece == '.':
-                    continue
-                
-                color = piece[0]
-                position = (row, col)
-                
-                #identify friendly defenders
-                if position in attacks:
-                    defenders = []
-                    for attacker_pos in attacks[position]:
-                        attacker = game_state["board"][attacker_pos[0]][attacker_pos[1]]
-                        if attacker[0] == color: #Same color = defender
-                            defenders.append(attacker_pos)
-                    
-                    #Store defended pieces
-                    if defenders:
-                        defenses[position] = defenders
-        
-        return defenses
+        return parse_move(move, self.current_game_state["board"])
 
     def play(self):
         print(f"\nWelcome to Mini Chess! Game mode: {self.mode}")
@@ -810,9 +320,11 @@ class MiniChess:
             
             if is_ai_turn:
                 #AI's turn: use AIP to generate move
-                ai_player = AI(self, self.heuristic_func)
+                if current_player not in self.ai_players:
+                    self.ai_players[current_player] = AI(self, self.heuristic_func, telemetry=self.telemetry)
+                ai_player = self.ai_players[current_player]
                 print(f"AI thinking (max {self.timeout} seconds)...")
-                move, search_score, time_taken, explored, states_by_depth = ai_player.get_move(self.current_game_state) #AI chosen move, Minimax or A-B evaluation, time AI took to decide, states AI analyzed, search breakdown per depth
+                move, search_score, time_taken, explored, states_by_depth = ai_player.get_move(self.current_game_state, self.position_history, self.unchanged_turns) #AI chosen move, Minimax or A-B evaluation, time AI took to decide, states AI analyzed, search breakdown per depth
                 
                 #Update AI stats (how many states AI analyzed & update dictionary)
                 self.states_explored += explored
@@ -823,7 +335,7 @@ class MiniChess:
                 heuristic_score = self.heuristic_func(self.current_game_state)
                 
                 #Display AI chosen move
-                print(f"AI chooses: {chr(move[0][1] + ord('A'))}{5 - move[0][0]} to {chr(move[1][1] + ord('A'))}{5 - move[1][0]}")
+                print(f"AI chooses: {square_name(move_start(move))} to {square_name(move_end(move))}")
                 
                 #Make the move and log with AI stats
                 new_state = copy.deepcopy(self.current_game_state)
@@ -844,7 +356,7 @@ class MiniChess:
                     
                     #converts input to a move
                     move = self.parse_input(move_input)
-                    if not move:
+                    if move is None:
                         with open(self.log_file, "a") as f:
                             f.write(f"Invalid input format by {current_player.capitalize()}: '{move_input}'\n\n")
                         print("Invalid format. Please use format like 'B2 B3'.")
@@ -0,0 +1,55 @@
+#Packed integer moves: from-square * 25 + to-square, + PROMOTION when a pawn reaches its last row (promoted to a Queen)
+#Squares are numbered row * 5 + col (A5 = 0, B5 = 1, ..., E1 = 24), same order as the board rows
+#Moves are plain ints inside the engine (no tuples allocated per move), the helpers below convert them
+#at the edges (console input, game trace logs, display, datasets)
+#Search hot paths (make_move, attack maps, playouts) inline move % PROMOTION // 25 and move % 25 instead of calling move_start/move_end
+from Tables import load_tables
+
+PROMOTION = 625 #promotion flag (25 * 25: above every from/to combination)
+
+#(row, col) of each square
+SQUARE_ROW_COL = [divmod(square, 5) for square in range(25)]
+
+###Pack a move from board coordinates (start=(row, col), end=(row, col))
+#board: if given, the promotion flag is set when the moved piece is a pawn reaching its last row
+def pack_move(start, end, board=None, promotion=False):
+    if board is not None:
+        piece = board[start[0]][start[1]]
+        promotion = piece[1:] == 'p' and end[0] == (0 if piece[0] == 'w' else 4)
+    return (start[0] * 5 + start[1]) * 25 + end[0] * 5 + end[1] + (PROMOTION if promotion else 0)
+
+###From-square / to-square of a packed move
+def move_start(move):
+    return move % PROMOTION // 25
+
+def move_end(move):
+    return move % 25
+
+###Square number -> chess notation (ex: 21 -> "B1")
+def square_name(square):
+    row, col = SQUARE_ROW_COL[square]
+    return f"{chr(col + ord('A'))}{5 - row}"
+
+###Packed move -> "B2 B3" (same format as console input)
+def move_to_string(move):
+    return f"{square_name(move_start(move))} {square_name(move_end(move))}"
+
+###"B2 B3" -> packed move (promotion flag taken from the board), None if the text isn't a move
+def parse_move(text, board):
+    try:
+        start, end = text.split()
+        start = (5 - int(start[1]), ord(start[0].upper()) - ord('A'))
+        end = (5 - int(end[1]), ord(end[0].upper()) - ord('A'))
+        if not all(0 <= x < 5 for x in start + end):
+            return None
+        return pack_move(start, end, board)
+    except (ValueError, IndexError):
+        return None
+
+#Precomputed move tables: target squares of Knights/Kings and rays of sliding pieces (nearest square first) from each square
+#(generated by Tables.py, loaded from its cache file when present)
+_tables = load_tables()
+KNIGHT_TARGETS = _tables["knight_targets"]
+KING_TARGETS = _tables["king_targets"]
+BISHOP_RAYS = _tables["bishop_rays"]
+QUEEN_RAYS = _tables["queen_rays"]
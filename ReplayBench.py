@@ -0,0 +1,167 @@
+#Replay-based regression benchmark: re-runs the current AI on every AI position of logged games
+#Positions are rebuilt from the moves of gameTrace-<b>-<t>-<m>.txt files (with the repetition history and no-capture counter
+#the AI had), searched again with the game's original settings, and compared with the logged time, states and chosen move
+import argparse
+import glob
+import json
+import sys
+import time
+
+from AI import AI
+from Engine import MiniChessEngine, position_key
+from GameTrace import parse_trace
+from Moves import move_to_string
+from Telemetry import json_score
+
+"""
+Rebuild the positions where an AI moved in a game trace
+
+Args:
+    - trace:    dictionary returned by GameTrace.parse_trace
+    - game:     MiniChessEngine | rules used to replay the moves
+Yields:
+    - (action index, game_state, history, unchanged_turns) before each AI move (same arguments MiniChess.play gave AI.get_move)
+"""
+def ai_positions(trace, game):
+    game_state = {"board": [row[:] for row in trace["initial_board"]], "turn": "white"}
+    history = [position_key(game_state)]
+    unchanged_turns = 0
+    actions = trace["actions"]
+    for i, action in enumerate(actions):
+        if action["move"] is None or not game.is_valid_move(game_state, action["move"]):
+            return #trace doesn't match the rules (edited/corrupted log)
+        if action["time"] is not None: #only AI moves log their search time
+            yield i, game_state, list(history), unchanged_turns
+
+        game_state, unchanged_turns, history = game.play_move(game_state, action["move"], unchanged_turns, history)
+
+        #Boards logged after each move must match the replay (the final winning move logs the board before the move)
+        if action["board"] is not None and i < len(actions) - 1 and action["board"] != game_state["board"]:
+            return
+
+###States explored by each AI move (differences of the cumulative counters, k/M rounded counts are approximate)
+def logged_states(trace):
+    states = {}
+    previous = 0
+    for i, action in enumerate(trace["actions"]):
+        if action["states_explored"] is not None:
+            states[i] = max(0, action["states_explored"] - previous)
+            previous = action["states_explored"]
+    return states
+
+"""
+Replay one game trace with the current AI
+
+Args:
+    - path:         gameTrace file
+    - timeout:      AI timeout override in seconds (None -> timeout logged in the trace)
+    - max_depth:    AI max search depth
+    - limit:        max nb of positions replayed (None -> all)
+Returns:
+    - list of {"action", "player", "logged_move", "move", "logged_time", "time", "logged_states", "states",
+               "logged_score", "score"} (empty if the trace has no AI moves or doesn't replay)
+"""
+def replay_trace(path, timeout=None, max_depth=3, limit=None):
+    trace = parse_trace(path)
+    params = trace["params"]
+    if trace["initial_board"] is None or "heuristic" not in params: #no AI in this game
+        return []
+    game = MiniChessEngine(params["heuristic"], timeout or params.get("timeout", 5), params.get("alpha_beta", True), params.get("max_turns", 100))
+    players = {} #one AI per color, kept between moves like MiniChess.play (caches reused)
+    states = logged_states(trace)
+
+    results = []
+    for i, game_state, history, unchanged_turns in ai_positions(trace, game):
+        if limit is not None and len(results) >= limit:
+            break
+        action = trace["actions"][i]
+        if action["player"] not in players:
+            players[action["player"]] = AI(game, game.heuristic_func, max_depth)
+        player = players[action["player"]]
+        move, score, elapsed, explored, _ = player.get_move(game_state, history, unchanged_turns)
+        results.append({
+            "action": i,
+            "player": action["player"],
+            "logged_move": move_to_string(action["move"]),
+            "move": move_to_string(move) if move is not None else None,
+            "logged_time": action["time"],
+            "time": elapsed,
+            "logged_states": states.get(i),
+            "states": explored,
+            "logged_score": json_score(action["search_score"]),
+            "score": json_score(score),
+        })
+    return results
+
+###Totals of replayed positions (Returns dictionary with speedup, state change and nb of different moves)
+def summarize(results):
+    logged_time = sum(r["logged_time"] for r in results)
+    new_time = sum(r["time"] for r in results)
+    counted = [r for r in results if r["logged_states"] is not None]
+    logged_states = sum(r["logged_states"] for r in counted)
+    new_states = sum(r["states"] for r in counted)
+    return {
+        "positions": len(results),
+        "logged_time": logged_time,
+        "time": new_time,
+        "speedup": logged_time / new_time if new_time > 0 else None,
+        "logged_states": logged_states,
+        "states": new_states,
+        "states_change": (new_states - logged_states) / logged_states if logged_states else None,
+        "move_changes": sum(1 for r in results if r["move"] != r["logged_move"]),
+    }
+
+def format_summary(name, summary):
+    line = f"{name}: {summary['positions']} positions, time {summary['logged_time']:.3f}s -> {summary['time']:.3f}s"
+    if summary["speedup"] is not None:
+        line += f" (x{summary['speedup']:.2f})"
+    line += f", states {summary['logged_states']} -> {summary['states']}"
+    if summary["states_change"] is not None:
+        line += f" ({summary['states_change'] * 100:+.1f}%)"
+    return line + f", {summary['move_changes']} different moves"
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run the current AI on the positions of logged games and compare with the logs")
+    parser.add_argument("traces", nargs="+", help="gameTrace-*.txt files (glob patterns allowed)")
+    parser.add_argument("--timeout", type=float, default=None, help="AI timeout override in seconds (default: logged timeout)")
+    parser.add_argument("--depth", type=int, default=3, help="AI max search depth")
+    parser.add_argument("--limit", type=int, default=None, help="max positions replayed per trace")
+    parser.add_argument("--verbose", action="store_true", help="print every position whose chosen move changed")
+    parser.add_argument("--json", default=None, help="write every replayed position and the summaries to a JSON file")
+    parser.add_argument("--min-speedup", type=float, default=None, help="exit with status 1 if the overall speedup is below this value")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.traces for path in glob.glob(pattern)})
+    start = time.time()
+    report = {"traces": {}, "total": None}
+    all_results = []
+    for path in paths:
+        results = replay_trace(path, args.timeout, args.depth, args.limit)
+        if not results:
+            print(f"{path}: no AI positions to replay")
+            continue
+        summary = summarize(results)
+        report["traces"][path] = {"summary": summary, "positions": results}
+        all_results += results
+        print(format_summary(path, summary))
+        if args.verbose:
+            for r in results:
+                if r["move"] != r["logged_move"]:
+                    print(f"  action {r['action'] + 1} ({r['player']}): {r['logged_move']} -> {r['move']} (score {r['logged_score']} -> {r['score']})")
+
+    if not all_results:
+        print("No positions replayed")
+        return
+    report["total"] = summarize(all_results)
+    print()
+    print(format_summary(f"Total ({len(report['traces'])} traces)", report["total"]))
+    print(f"Replayed in {time.time() - start:.1f} sec (logged states are approximate above 1000: k/M rounded counters)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.min_speedup is not None and (report["total"]["speedup"] or 0) < args.min_speedup:
+        print(f"Speedup below {args.min_speedup}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
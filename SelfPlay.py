@@ -0,0 +1,311 @@
+#Self-play data generator: AI vs AI games in parallel worker processes
+#Every position (packed board, side to move, search score, chosen move, final result) is streamed
+#into a fixed-width binary dataset (chunked zlib compression + chunk index) readable with SelfPlayDataset
+import argparse
+import math
+import mmap
+import multiprocessing
+import random
+import struct
+import time
+import zlib
+
+from AI import AI
+from Engine import MiniChessEngine, position_key
+from SharedTT import SharedTranspositionTable
+
+#Piece codes used in packed boards (4 bits per square, 2 squares per byte)
+PIECE_CODES = ['.', 'wp', 'wN', 'wB', 'wQ', 'wK', 'bp', 'bN', 'bB', 'bQ', 'bK']
+PIECE_INDEX = {piece: code for code, piece in enumerate(PIECE_CODES)}
+BOARD_BYTES = 13 #25 squares * 4 bits
+
+#Record layout (little-endian, no padding): board, turn (0 white | 1 black), search score, packed move (from*25 + to + promotion flag, see Moves.py), result (1 | 0 | -1), ply
+RECORD = struct.Struct("<13sBfHbH")
+NO_MOVE = 0xFFFF
+RESULT_CODES = {"white": 1, "draw": 0, "black": -1}
+
+#File layout: header | chunks | index (offset, compressed size, nb records per chunk) | footer
+MAGIC = b"MCSP"
+VERSION = 2 #version 2: moves stored with the promotion flag
+HEADER = struct.Struct("<4sHHII") #magic, version, record size, records per chunk, compressed (0/1)
+INDEX_ENTRY = struct.Struct("<QII")
+FOOTER = struct.Struct("<QIQ4s") #index offset, nb chunks, nb records, magic
+FOOTER_MAGIC = b"MCIX"
+
+###Pack a board (5x5 list of pieces) into 13 bytes
+def pack_board(board):
+    codes = [PIECE_INDEX[piece] for row in board for piece in row] + [0]
+    return bytes(codes[i] | (codes[i + 1] << 4) for i in range(0, 26, 2))
+
+###Unpack 13 bytes into a board (5x5 list of pieces)
+def unpack_board(packed):
+    codes = []
+    for byte in packed:
+        codes.append(byte & 0x0F)
+        codes.append(byte >> 4)
+    return [[PIECE_CODES[codes[row * 5 + col]] for col in range(5)] for row in range(5)]
+
+###Packed move (None if no move) <-> record move field
+def encode_move(move):
+    return NO_MOVE if move is None else move
+
+def decode_move(code):
+    return None if code == NO_MOVE else code
+
+###Convert a record tuple (as unpacked by RECORD) into a readable dictionary with a game_state
+def decode_record(record):
+    packed, turn, score, move, result, ply = record
+    return {
+        "game_state": {"board": unpack_board(packed), "turn": "black" if turn else "white"},
+        "score": score,
+        "move": decode_move(move),
+        "result": result,
+        "ply": ply,
+    }
+
+class DatasetWriter:
+    ###Open a dataset file for writing (records are buffered and written one compressed chunk at a time)
+    def __init__(self, path, chunk_records=4096, compress=True):
+        self.file = open(path, "wb")
+        self.chunk_records = chunk_records
+        self.compress = compress
+        self.buffer = [] #packed records of the chunk being filled
+        self.index = [] #(offset, size, nb records) per chunk
+        self.count = 0 #total records written
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, chunk_records, int(compress)))
+
+    def write(self, record):
+        self.buffer.append(RECORD.pack(*record))
+        self.count += 1
+        if len(self.buffer) >= self.chunk_records:
+            self.flush_chunk()
+
+    def flush_chunk(self):
+        if not self.buffer:
+            return
+        data = b"".join(self.buffer)
+        if self.compress:
+            data = zlib.compress(data, 6)
+        self.index.append((self.file.tell(), len(data), len(self.buffer)))
+        self.file.write(data)
+        self.buffer = []
+
+    def close(self):
+        self.flush_chunk()
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), self.count, FOOTER_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SelfPlayDataset:
+    ###Memory-map a dataset file and read its chunk index (records are decoded lazily, one chunk at a time)
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.chunk_records, compressed = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} self-play dataset")
+        self.compressed = bool(compressed)
+        index_offset, nb_chunks, self.count, footer_magic = FOOTER.unpack_from(self.map, len(self.map) - FOOTER.size)
+        if footer_magic != FOOTER_MAGIC:
+            raise ValueError(f"{path} is incomplete (missing index)")
+        self.index = [INDEX_ENTRY.unpack_from(self.map, index_offset + i * INDEX_ENTRY.size) for i in range(nb_chunks)]
+        self.starts = [] #first record number of each chunk
+        total = 0
+        for _, _, records in self.index:
+            self.starts.append(total)
+            total += records
+        self.cached_chunk = (None, None) #(chunk number, raw bytes) of the last chunk read
+
+    def __len__(self):
+        return self.count
+
+    ###Raw (uncompressed) bytes of one chunk
+    def chunk_bytes(self, chunk):
+        if self.cached_chunk[0] == chunk:
+            return self.cached_chunk[1]
+        offset, size, _ = self.index[chunk]
+        data = self.map[offset:offset + size]
+        if self.compressed:
+            data = zlib.decompress(data)
+        self.cached_chunk = (chunk, data)
+        return data
+
+    ###Raw bytes of records [start, stop) (only the chunks covering the range are read)
+    def raw(self, start, stop):
+        start, stop = max(0, start), min(self.count, stop)
+        parts = []
+        chunk = max(0, self.chunk_of(start))
+        while start < stop:
+            data = self.chunk_bytes(chunk)
+            first = start - self.starts[chunk]
+            last = min(stop - self.starts[chunk], self.index[chunk][2])
+            parts.append(data[first * RECORD.size:last * RECORD.size])
+            start = self.starts[chunk] + last
+            chunk += 1
+        return b"".join(parts)
+
+    def chunk_of(self, record):
+        low, high = 0, len(self.starts) - 1
+        while low < high: #binary search on chunk start positions
+            mid = (low + high + 1) // 2
+            if self.starts[mid] <= record:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    ###dataset[i] -> record tuple | dataset[a:b] -> list of record tuples (see RECORD)
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            indices = range(*key.indices(self.count))
+            if not indices:
+                return []
+            low = min(indices[0], indices[-1])
+            records = list(RECORD.iter_unpack(self.raw(low, max(indices[0], indices[-1]) + 1)))
+            return [records[i - low] for i in indices]
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("record index out of range")
+        return RECORD.unpack(self.raw(key, key + 1))
+
+    ###Records [start, stop) as a NumPy structured array (requires NumPy)
+    def to_numpy(self, start=0, stop=None):
+        import numpy as np
+        dtype = np.dtype([("board", "u1", BOARD_BYTES), ("turn", "u1"), ("score", "<f4"), ("move", "<u2"), ("result", "i1"), ("ply", "<u2")])
+        return np.frombuffer(self.raw(start, self.count if stop is None else stop), dtype=dtype)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+"""
+Play one headless game between two engines (AI, or any object with the same get_move interface)
+
+Args:
+    - game:          MiniChessEngine | rules, move generation, max_turns
+    - white, black:  engines used for each side
+    - random_plies:  number of opening plies played at random (varied games)
+    - rng:           random.Random used for the random plies
+Returns:
+    - positions: list of (game_state, search score, chosen move) before each move
+    - result:    "white" | "black" | "draw"
+"""
+def play_game(game, white, black, random_plies=0, rng=None):
+    rng = rng or random.Random()
+    game_state = game.init_board()
+    unchanged_turns = 0
+    turn_count = 1
+    history = [position_key(game_state)]
+    positions = []
+    ply = 0
+    while True:
+        engine = white if game_state["turn"] == "white" else black
+        if ply < random_plies:
+            move, score = rng.choice(game.valid_moves(game_state)), float('nan')
+        else:
+            move, score = engine.get_move(game_state, history, unchanged_turns)[:2]
+        if move is None: #no legal move for the side to move
+            return positions, "draw"
+        positions.append((game_state, score, move))
+
+        #Play move and update draw counters (same rules as MiniChess.make_move)
+        if game_state["turn"] == "black":
+            turn_count += 1
+        game_state, unchanged_turns, history = game.play_move(game_state, move, unchanged_turns, history)
+        ply += 1
+
+        result = game.game_result(game_state, unchanged_turns, turn_count)
+        if result is not None:
+            return positions, result
+
+###Play one self-play game in a worker process (Returns list of packed records)
+def self_play_game(args):
+    seed, heuristic, timeout, max_depth, max_turns, random_plies, tt = args
+    game = MiniChessEngine(heuristic, timeout, True, max_turns)
+    engine = AI(game, game.heuristic_func, max_depth, tt=tt)
+    positions, result = play_game(game, engine, engine, random_plies, random.Random(seed))
+    result_code = RESULT_CODES[result]
+    records = []
+    for ply, (game_state, score, move) in enumerate(positions):
+        score = score if isinstance(score, (int, float)) and math.isfinite(score) else float('nan')
+        records.append((pack_board(game_state["board"]), game_state["turn"] == "black", score, encode_move(move), result_code, ply))
+    return records
+
+"""
+Generate a self-play dataset
+
+Args:
+    - path:     output dataset file
+    - games:    number of games
+    - workers:  number of worker processes
+    - shared_tt: entries of a transposition table shared by all workers (0 -> private table per game)
+    - other args: engine settings used by both sides
+Returns:
+    - (nb games, nb positions)
+"""
+def generate(path, games, workers=1, heuristic="e2", timeout=1, max_depth=3, max_turns=100, random_plies=4, seed=0, chunk_records=4096, compress=True, shared_tt=0):
+    tt = SharedTranspositionTable(shared_tt) if shared_tt > 0 else None #sent to workers by name
+    jobs = [(seed + i, heuristic, timeout, max_depth, max_turns, random_plies, tt) for i in range(games)]
+    try:
+        positions = write_games(path, jobs, workers, chunk_records, compress)
+    finally:
+        if tt is not None:
+            tt.close()
+    return games, positions
+
+###Play the self-play jobs and stream their records into a dataset (Returns nb of positions)
+def write_games(path, jobs, workers, chunk_records, compress):
+    positions = 0
+    with DatasetWriter(path, chunk_records, compress) as writer:
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                for records in pool.imap_unordered(self_play_game, jobs): #stream each game as soon as it is finished
+                    for record in records:
+                        writer.write(record)
+                    positions += len(records)
+        else:
+            for job in jobs:
+                records = self_play_game(job)
+                for record in records:
+                    writer.write(record)
+                positions += len(records)
+    return positions
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a self-play dataset of AI vs AI positions")
+    parser.add_argument("--out", default="selfplay.bin")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--heuristic", choices=["e0", "e1", "e2"], default="e2")
+    parser.add_argument("--timeout", type=float, default=1, help="AI timeout per move in seconds")
+    parser.add_argument("--depth", type=int, default=3, help="AI max search depth")
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--random-plies", type=int, default=4, help="opening plies played at random for variety")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-records", type=int, default=4096)
+    parser.add_argument("--no-compress", action="store_true", help="store raw chunks (no decompression when reading)")
+    parser.add_argument("--shared-tt", type=int, default=0, help="entries of a transposition table shared by all workers (0 -> private tables)")
+    args = parser.parse_args()
+
+    start = time.time()
+    games, positions = generate(args.out, args.games, args.workers, args.heuristic, args.timeout, args.depth, args.max_turns,
+                                args.random_plies, args.seed, args.chunk_records, not args.no_compress, args.shared_tt)
+    print(f"Wrote {positions} positions from {games} games to {args.out} in {time.time() - start:.1f} sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#Transposition table stored in shared memory (multiprocessing.shared_memory), usable by several worker processes at once
+#Same probe/store/clear interface as AI.TranspositionTable: workers attach to the table by name and share their search work
+#Lock-free: each entry is 2 x 64 bits (key ^ data, data); a torn write (entry written by 2 processes at once)
+#fails the key check on probe and is treated as a miss
+import struct
+from multiprocessing import shared_memory
+
+from AI import TT_SIZE
+
+BUCKET_ENTRIES = 4 #entries per bucket (one 64-byte bucket per key index)
+ENTRY = struct.Struct("<QQ") #key ^ data, data
+BUCKET = struct.Struct("<" + "QQ" * BUCKET_ENTRIES)
+
+#data layout: bits 0-15 packed move (NO_MOVE if none), bits 16-23 searched depth, bit 63 entry used
+NO_MOVE = 0xFFFF
+USED = 1 << 63
+
+_attached = {} #name -> table attached by this process (one mapping per process, reused by every job)
+
+class SharedTranspositionTable:
+    """
+    Create a shared table (name=None) or attach to an existing one by name
+
+    Args:
+        - size:     max nb of entries (rounded down to full buckets), ignored when attaching
+        - name:     shared memory block name of an existing table (SharedTranspositionTable.name),
+                    attaching processes are expected to be worker processes started by the creator (multiprocessing)
+    """
+    def __init__(self, size=TT_SIZE, name=None):
+        self.owner = name is None #only the creator unlinks the block
+        if self.owner:
+            buckets = max(1, size // BUCKET_ENTRIES)
+            self.memory = shared_memory.SharedMemory(create=True, size=buckets * BUCKET.size)
+            self.memory.buf[:] = bytes(len(self.memory.buf)) #all entries empty
+        else:
+            self.memory = shared_memory.SharedMemory(name=name) #workers share the creator's resource tracker: the block is freed once, by the creator
+        self.buckets = len(self.memory.buf) // BUCKET.size
+        self.size = self.buckets * BUCKET_ENTRIES
+
+    ###Attach to the table created by another process (once per process)
+    @classmethod
+    def attach(cls, name):
+        table = _attached.get(name)
+        if table is None or table.memory is None:
+            table = _attached[name] = cls(name=name)
+        return table
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    ###Stored (depth, move) of a position, None if unknown
+    def probe(self, key):
+        values = BUCKET.unpack_from(self.memory.buf, (key % self.buckets) * BUCKET.size)
+        for i in range(0, 2 * BUCKET_ENTRIES, 2):
+            check, data = values[i], values[i + 1]
+            if data and check ^ data == key:
+                move = data & 0xFFFF
+                return (data >> 16) & 0xFF, (None if move == NO_MOVE else move)
+        return None
+
+    ###Store the best move of a position (deeper searches are kept over shallower ones)
+    #Replaces the entry of the same position, else an empty entry, else the shallowest entry of the bucket
+    def store(self, key, depth, move):
+        offset = (key % self.buckets) * BUCKET.size
+        values = BUCKET.unpack_from(self.memory.buf, offset)
+        data = USED | (min(depth, 0xFF) << 16) | (NO_MOVE if move is None else move)
+        slot = None
+        shallowest = None
+        for i in range(BUCKET_ENTRIES):
+            check, stored = values[2 * i], values[2 * i + 1]
+            if stored and check ^ stored == key: #same position
+                if (stored >> 16) & 0xFF > depth:
+                    return
+                slot = i
+                break
+            if not stored:
+                if slot is None:
+                    slot = i
+            elif shallowest is None or (stored >> 16) & 0xFF < (values[2 * shallowest + 1] >> 16) & 0xFF:
+                shallowest = i
+        if slot is None:
+            slot = shallowest
+        ENTRY.pack_into(self.memory.buf, offset + slot * ENTRY.size, key ^ data, data)
+
+    def clear(self):
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+
+    ###Nb of used entries (scans the whole table)
+    def used(self):
+        return sum(1 for (check, data) in ENTRY.iter_unpack(self.memory.buf) if data)
+
+    ###Detach from the table (the creator also frees the shared memory block)
+    def close(self):
+        if self.memory is None:
+            return
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+    ###Tables are sent to worker processes by name (workers attach to the same memory)
+    def __reduce__(self):
+        return (SharedTranspositionTable.attach, (self.name,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,81 @@
+#Startup benchmark: cold import of the engine core (Engine.py + AI.py) and first search, each run in a fresh interpreter
+#Compares loading the precomputed tables from the Tables.py cache file with generating them at import
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import Tables
+
+#Code run by each fresh interpreter (prints import time, first search time, states explored)
+CHILD = """
+import time
+start = time.perf_counter()
+import Tables
+if not {use_cache}:
+    Tables.read_cache = lambda path=None: None
+import Engine
+from AI import AI
+imported = time.perf_counter()
+game = Engine.MiniChessEngine({heuristic!r}, {timeout})
+_, _, _, states, _ = AI(game, game.heuristic_func, {depth}).get_move(game.init_board(), None, 0)
+print(imported - start, time.perf_counter() - imported, states)
+"""
+
+"""
+Time one cold start
+
+Args:
+    - use_cache:    load the tables from the cache file (False -> generate them)
+    - heuristic, timeout, depth: settings of the first search (initial position)
+Returns:
+    - (process time, import time, first search time, states explored), times in seconds
+"""
+def cold_start(use_cache, heuristic="e2", timeout=5, depth=3):
+    code = CHILD.format(use_cache=use_cache, heuristic=heuristic, timeout=timeout, depth=depth)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True).stdout
+    elapsed = time.perf_counter() - start
+    import_time, search_time, states = output.split()
+    return elapsed, float(import_time), float(search_time), int(states)
+
+###Median process/import/search times of each variant (runs of the variants interleaved so machine noise hits them alike)
+#variants: list of (name, use_cache), Returns dictionary: name -> {"process", "import", "search", "states"}
+def measure(variants, runs, heuristic, timeout, depth):
+    results = {name: [] for name, _ in variants}
+    for _ in range(runs):
+        for name, use_cache in variants:
+            results[name].append(cold_start(use_cache, heuristic, timeout, depth))
+    return {name: {
+        "process": statistics.median(r[0] for r in runs_of_variant),
+        "import": statistics.median(r[1] for r in runs_of_variant),
+        "search": statistics.median(r[2] for r in runs_of_variant),
+        "states": runs_of_variant[0][3],
+    } for name, runs_of_variant in results.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import of the engine core plus the first search")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per variant (median reported)")
+    parser.add_argument("--depth", type=int, default=3, help="max depth of the first search")
+    parser.add_argument("--timeout", type=float, default=5, help="AI timeout of the first search in seconds")
+    parser.add_argument("--heuristic", choices=["e0", "e1", "e2"], default="e2")
+    parser.add_argument("--no-build", action="store_true", help="don't write the tables cache file if it is missing")
+    args = parser.parse_args()
+
+    if Tables.read_cache() is None and not args.no_build:
+        Tables.write_cache(Tables.build_tables())
+        print(f"Wrote tables cache {Tables.TABLES_FILE}")
+    variants = [("generated tables", False)]
+    if Tables.read_cache() is not None:
+        variants.insert(0, ("cached tables", True))
+
+    print(f"Cold start (median of {args.runs} runs, depth {args.depth} {args.heuristic} search from the initial position):")
+    for name, result in measure(variants, args.runs, args.heuristic, args.timeout, args.depth).items():
+        print(f"  {name:<17} process {result['process'] * 1000:.1f} ms | import {result['import'] * 1000:.1f} ms"
+              f" | first search {result['search'] * 1000:.1f} ms ({result['states']} states)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#Precomputed engine tables (move tables of Moves.py, Zobrist keys of Engine.py and AI.py) and their on-disk cache
+#The tables are loaded from a versioned cache file on first use, or generated when the file is missing or outdated
+#Importing the engine never writes the cache: build it with "python Tables.py" (or StartupBench.py)
+import os
+import pickle
+
+TABLES_VERSION = 1 #bump when a table or its generation changes (cache files of other versions are ignored)
+TABLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"engine_tables_v{TABLES_VERSION}.pickle")
+
+ZOBRIST_SEED = 472 #fixed seed so keys are identical across runs
+PIECES = ('wp', 'wN', 'wB', 'wQ', 'wK', 'bp', 'bN', 'bB', 'bQ', 'bK')
+
+_tables = None #tables loaded by this process
+
+#Target squares of Knights/Kings and rays of sliding pieces (nearest square first) from each square
+def _targets(steps):
+    table = []
+    for square in range(25):
+        row, col = divmod(square, 5)
+        table.append([(row + dr) * 5 + col + dc for dr, dc in steps if 0 <= row + dr < 5 and 0 <= col + dc < 5])
+    return table
+
+def _rays(directions):
+    table = []
+    for square in range(25):
+        row, col = divmod(square, 5)
+        rays = []
+        for dr, dc in directions:
+            ray = []
+            r, c = row + dr, col + dc
+            while 0 <= r < 5 and 0 <= c < 5:
+                ray.append(r * 5 + c)
+                r += dr
+                c += dc
+            if ray:
+                rays.append(ray)
+        table.append(rays)
+    return table
+
+###Generate every table (Returns dictionary: table name -> table)
+def build_tables():
+    import random #only needed to generate the keys (not imported when the cache is used)
+
+    rng = random.Random(ZOBRIST_SEED)
+    zobrist_pieces = {piece: [rng.getrandbits(64) for _ in range(25)] for piece in PIECES}
+    zobrist_black_turn = rng.getrandbits(64)
+    #Color-flipped key of each piece/square: piece of the other color on the square rotated 180 degrees
+    swap_color = {piece: ('b' if piece[0] == 'w' else 'w') + piece[1] for piece in PIECES}
+    zobrist_flipped = {piece: [zobrist_pieces[swap_color[piece]][24 - square] for square in range(25)] for piece in PIECES}
+
+    return {
+        "knight_targets": _targets([(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]),
+        "king_targets": _targets([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]),
+        "bishop_rays": _rays([(-1, -1), (-1, 1), (1, -1), (1, 1)]),
+        "queen_rays": _rays([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]),
+        "zobrist_pieces": zobrist_pieces,
+        "zobrist_black_turn": zobrist_black_turn,
+        "zobrist_flipped": zobrist_flipped,
+    }
+
+###Read a cache file, None if it is missing, unreadable or written by another version
+def read_cache(path=TABLES_FILE):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != TABLES_VERSION or data.get("seed") != ZOBRIST_SEED:
+        return None
+    return data["tables"]
+
+###Write the tables to a cache file (written to a temporary file first: readers never see a partial file)
+def write_cache(tables, path=TABLES_FILE):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump({"version": TABLES_VERSION, "seed": ZOBRIST_SEED, "tables": tables}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+###Tables of this process: loaded from the cache file on first use, generated (without writing the cache) if there is none
+def load_tables():
+    global _tables
+    if _tables is None:
+        _tables = read_cache() or build_tables()
+    return _tables
+
+def main():
+    tables = build_tables()
+    write_cache(tables)
+    print(f"Wrote {TABLES_FILE} ({len(tables)} tables, version {TABLES_VERSION})")
+
+if __name__ == "__main__":
+    main()
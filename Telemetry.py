@@ -0,0 +1,144 @@
+#Search telemetry: per move and per iterative-deepening iteration stats of the AI
+#Records are kept in memory (queryable by tournament/benchmark tools) and optionally streamed to a JSON lines file
+import json
+import math
+
+from Moves import move_to_string
+
+###Format a packed move as "B2 B3" (same format as console input)
+def format_move(move):
+    if move is None:
+        return None
+    return move_to_string(move)
+
+###Make a score JSON friendly (infinite/NaN scores from timed out searches -> None)
+def json_score(score):
+    if score is None or not math.isfinite(score):
+        return None
+    return score
+
+class SearchTelemetry:
+    ###Create an empty telemetry (path: JSON lines file records are appended to, None -> memory only)
+    def __init__(self, path=None):
+        self.path = path
+        self.records = [] #all records in order ("iteration" and "move" records)
+        self.move_number = 0 #nb of moves searched so far
+        self.player = None #side to move of the current search
+        self.last_nodes = 0 #nodes of the previous iteration (effective branching factor)
+        self.last_counters = None #AI counters at the end of the previous iteration
+        self.last_completed = None #last completed iteration record of the current move
+
+    ###Create or truncate the JSON lines file
+    def reset_file(self):
+        if self.path:
+            open(self.path, "w").close()
+
+    ###Snapshot of the AI counters used to compute per-iteration deltas
+    def counters(self, ai):
+        return ai.beta_cutoffs, ai.first_move_cutoffs, {name: tuple(stats) for name, stats in ai.cache_stats.items()}
+
+    ###Called by AI.get_move before the first iteration
+    def begin_move(self, game_state, ai):
+        self.move_number += 1
+        self.player = game_state["turn"]
+        self.last_nodes = 0
+        self.last_counters = self.counters(ai)
+        self.last_completed = None
+
+    ###Called by AI.get_move after each iteration
+    def record_iteration(self, ai, depth, nodes, seconds, score, completed):
+        cutoffs, first_cutoffs, caches = self.counters(ai)
+        previous_cutoffs, previous_first, previous_caches = self.last_counters
+        cutoffs -= previous_cutoffs
+        first_cutoffs -= previous_first
+        hit_rates = {}
+        for name, (hits, probes) in caches.items():
+            previous_hits, previous_probes = previous_caches.get(name, (0, 0))
+            probes -= previous_probes
+            hit_rates[name] = (hits - previous_hits) / probes if probes else None
+
+        record = {
+            "type": "iteration",
+            "move_number": self.move_number,
+            "player": self.player,
+            "depth": depth,
+            "nodes": nodes,
+            "time": seconds,
+            "nps": nodes / seconds if seconds > 0 else None,
+            "beta_cutoffs": cutoffs,
+            "first_move_cutoff_rate": first_cutoffs / cutoffs if cutoffs else None,
+            "ebf": nodes / self.last_nodes if self.last_nodes else None, #effective branching factor (nodes of this iteration / previous one)
+            "cache_hit_rates": hit_rates,
+            "score": json_score(score),
+            "pv": [format_move(m) for m in ai.pv[0]],
+            "completed": completed,
+        }
+        self.last_nodes = nodes
+        self.last_counters = self.counters(ai)
+        if completed:
+            self.last_completed = record
+        self.emit(record)
+
+    ###Called by AI.get_move once the move is chosen
+    def end_move(self, ai, move, score, elapsed):
+        cutoffs = ai.beta_cutoffs
+        record = {
+            "type": "move",
+            "move_number": self.move_number,
+            "player": self.player,
+            "move": format_move(move),
+            "score": json_score(score),
+            "depth": self.last_completed["depth"] if self.last_completed else 0, #deepest completed iteration
+            "nodes": ai.states_explored,
+            "time": elapsed,
+            "nps": ai.states_explored / elapsed if elapsed > 0 else None,
+            "beta_cutoffs": cutoffs,
+            "first_move_cutoff_rate": ai.first_move_cutoffs / cutoffs if cutoffs else None,
+            "cache_hit_rates": {name: hits / probes if probes else None for name, (hits, probes) in ai.cache_stats.items()},
+            "pv": self.last_completed["pv"] if self.last_completed else [format_move(move)] if move is not None else [],
+        }
+        self.emit(record)
+
+    def emit(self, record):
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    ###Query records by field values (ex: iterations(depth=3, player="white"))
+    def iterations(self, **filters):
+        return self.select("iteration", filters)
+
+    def moves(self, **filters):
+        return self.select("move", filters)
+
+    def select(self, record_type, filters):
+        return [r for r in self.records if r["type"] == record_type and all(r.get(k) == v for k, v in filters.items())]
+
+    ###Aggregate stats over all moves (optionally for one player)
+    def summary(self, player=None):
+        moves = self.moves(player=player) if player else self.moves()
+        nodes = sum(r["nodes"] for r in moves)
+        seconds = sum(r["time"] for r in moves)
+        cutoffs = sum(r["beta_cutoffs"] for r in moves)
+        first_cutoffs = sum(r["beta_cutoffs"] * r["first_move_cutoff_rate"] for r in moves if r["first_move_cutoff_rate"] is not None)
+        ebfs = [r["ebf"] for r in self.iterations() if r["ebf"] is not None and r["completed"] and (player is None or r["player"] == player)]
+        return {
+            "moves": len(moves),
+            "nodes": nodes,
+            "time": seconds,
+            "nps": nodes / seconds if seconds > 0 else None,
+            "avg_depth": sum(r["depth"] for r in moves) / len(moves) if moves else None,
+            "beta_cutoffs": cutoffs,
+            "first_move_cutoff_rate": first_cutoffs / cutoffs if cutoffs else None,
+            "avg_ebf": sum(ebfs) / len(ebfs) if ebfs else None,
+        }
+
+    ###Load records from a JSON lines file written by a previous game
+    @classmethod
+    def load(cls, path):
+        telemetry = cls()
+        with open(path) as f:
+            telemetry.records = [json.loads(line) for line in f if line.strip()]
+        telemetry.move_number = max((r["move_number"] for r in telemetry.records), default=0)
+        return telemetry
@@ -0,0 +1,120 @@
+#Head-to-head matches between engines (alpha-beta, minimax, MCTS) under the same timeout
+#Colors alternate every game, the first plies can be randomized for varied games
+import argparse
+import random
+import time
+
+from AI import AI
+from Engine import MiniChessEngine
+from MCTS import MCTS
+from SelfPlay import play_game
+from Telemetry import SearchTelemetry
+
+ENGINES = ["alphabeta", "minimax", "mcts"]
+
+class EnginePlayer:
+    ###Wrap an engine and accumulate its per-move stats (same get_move interface)
+    def __init__(self, name, engine, telemetry=None):
+        self.name = name
+        self.engine = engine
+        self.telemetry = telemetry #SearchTelemetry of AI engines (None for MCTS)
+        self.moves = 0
+        self.time = 0.0
+        self.nodes = 0
+        self.playouts = 0
+
+    def get_move(self, game_state, history=None, unchanged_turns=0):
+        result = self.engine.get_move(game_state, history, unchanged_turns)
+        self.moves += 1
+        self.time += result[2]
+        self.nodes += result[3]
+        self.playouts += getattr(self.engine, "playouts", 0)
+        return result
+
+    ###Summary line of the engine stats
+    def stats(self):
+        line = f"{self.moves} moves, avg {self.time / max(1, self.moves):.3f} sec/move, {self.nodes / max(self.time, 1e-9):.0f} nodes/sec"
+        if self.playouts:
+            line += f", {self.playouts / max(self.time, 1e-9):.0f} playouts/sec"
+        if self.telemetry is not None:
+            summary = self.telemetry.summary()
+            if summary["avg_depth"] is not None:
+                line += f", avg depth {summary['avg_depth']:.2f}"
+        return line
+
+###Create an engine by name with its own headless game (Returns EnginePlayer)
+def make_engine(name, heuristic="e2", timeout=1, max_depth=3, mcts_workers=0, seed=None):
+    game = MiniChessEngine(heuristic, timeout, name != "minimax")
+    if name == "mcts":
+        return EnginePlayer(name, MCTS(game, game.heuristic_func, workers=mcts_workers, seed=seed))
+    telemetry = SearchTelemetry()
+    return EnginePlayer(name, AI(game, game.heuristic_func, max_depth, telemetry), telemetry)
+
+"""
+Play a match between two engines
+
+Args:
+    - first, second: EnginePlayer | engines (first plays White in even games)
+    - games:         number of games
+    - max_turns:     max full turns per game (draw after)
+    - random_plies:  opening plies played at random
+Returns:
+    - scores: {engine name: [wins, draws, losses]} (engines with the same name are suffixed with their seat 1/2)
+"""
+def run_match(first, second, games, max_turns=100, random_plies=2, seed=0, verbose=True):
+    rules = MiniChessEngine(max_turns=max_turns) #rules/move generation of the match games
+    scores = {id(first): [0, 0, 0], id(second): [0, 0, 0]}
+    for i in range(games):
+        white, black = (first, second) if i % 2 == 0 else (second, first)
+        reset_tree(white)
+        reset_tree(black)
+        start = time.time()
+        positions, result = play_game(rules, white, black, random_plies, random.Random(seed + i))
+        if result == "draw":
+            scores[id(white)][1] += 1
+            scores[id(black)][1] += 1
+        else:
+            winner, loser = (white, black) if result == "white" else (black, white)
+            scores[id(winner)][0] += 1
+            scores[id(loser)][2] += 1
+        if verbose:
+            print(f"Game {i + 1}: {white.name} (White) vs {black.name} (Black) -> {result} in {len(positions)} plies ({time.time() - start:.1f} sec)")
+    names = [first.name, second.name]
+    if names[0] == names[1]:
+        names = [f"{names[0]}-1", f"{names[1]}-2"]
+    return {names[0]: scores[id(first)], names[1]: scores[id(second)]}
+
+###New game -> MCTS trees from the previous game are useless
+def reset_tree(player):
+    if isinstance(player.engine, MCTS):
+        player.engine.root = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Head-to-head match between two engines under the same timeout")
+    parser.add_argument("first", choices=ENGINES)
+    parser.add_argument("second", choices=ENGINES)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=1, help="AI timeout per move in seconds (both engines)")
+    parser.add_argument("--heuristic", choices=["e0", "e1", "e2"], default="e2")
+    parser.add_argument("--depth", type=int, default=3, help="max search depth of alpha-beta/minimax")
+    parser.add_argument("--mcts-workers", type=int, default=0, help="processes running MCTS playout batches (0 -> in process)")
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--random-plies", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    first = make_engine(args.first, args.heuristic, args.timeout, args.depth, args.mcts_workers, args.seed)
+    second = make_engine(args.second, args.heuristic, args.timeout, args.depth, args.mcts_workers, args.seed + 1)
+    try:
+        scores = run_match(first, second, args.games, args.max_turns, args.random_plies, args.seed)
+    finally:
+        for player in (first, second):
+            if isinstance(player.engine, MCTS):
+                player.engine.close()
+
+    print()
+    for (name, (wins, draws, losses)), player in zip(scores.items(), (first, second)):
+        print(f"{name}: +{wins} ={draws} -{losses} | {player.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#Texel-style tuner for the positional weights of heuristic_e1 / heuristic_e2
+#1) extract: replay labelled games (game traces or SelfPlay.py datasets), store one feature vector per position (NumPy arrays in a .npz file)
+#2) fit: minimize the logistic loss of sigmoid(scale * eval) against game outcomes with vectorized gradient steps
+#The fitted weights are written to heuristic_weights_<heuristic>.json (with the heuristic and attack term they were fitted for),
+#which MiniChessEngine loads on creation when its settings match
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing
+import time
+
+import numpy as np
+
+from GameTrace import parse_trace
+from SelfPlay import SelfPlayDataset, decode_record
+from Engine import MiniChessEngine, E1_TERMS, E2_TERMS, DEFAULT_HEURISTIC_WEIGHTS, heuristic_weights_file
+
+TERMS = E1_TERMS + E2_TERMS #column order of the feature matrix
+RESULT_LABELS = {"white": 1.0, "draw": 0.5, "black": 0.0} #game outcome from White's point of view
+
+_worker_game = None #headless game used by extraction worker processes
+
+###Positions (game_state, label) of finished games, rebuilt by replaying the moves of game traces
+def trace_positions(paths):
+    game = MiniChessEngine()
+    for path in paths:
+        trace = parse_trace(path)
+        if trace["result"] is None or trace["initial_board"] is None: #unfinished game -> no label
+            continue
+        label = RESULT_LABELS[trace["result"]]
+        game_state = {"board": trace["initial_board"], "turn": "white"}
+        for action in trace["actions"]:
+            game_state = game.make_move(game_state, action["move"], update_game=False)
+            yield game_state, label
+
+###Positions (game_state, label) of a self-play dataset written by SelfPlay.py
+def dataset_positions(paths, chunk=65536):
+    for path in paths:
+        with SelfPlayDataset(path) as dataset:
+            for start in range(0, len(dataset), chunk):
+                for record in dataset[start:start + chunk]:
+                    record = decode_record(record)
+                    yield record["game_state"], (record["result"] + 1) / 2 #1 | 0 | -1 -> 1 | 0.5 | 0
+
+###Create the headless game used to compute features (in each worker process)
+def init_worker(attack_term="attackers"):
+    global _worker_game
+    _worker_game = MiniChessEngine(attack_term=attack_term)
+
+###Material score and feature vector of one labelled position (runs in worker processes)
+def position_features(item):
+    if _worker_game is None:
+        init_worker()
+    game_state, label = item
+    terms = _worker_game.heuristic_terms(game_state, strategic=True)
+    return _worker_game.heuristic_e0(game_state), [terms[term] for term in TERMS], label
+
+###Is a king missing (game already decided, material swing of 999 says nothing about the weights)
+def is_terminal(game_state):
+    pieces = {piece for row in game_state["board"] for piece in row}
+    return 'wK' not in pieces or 'bK' not in pieces
+
+"""
+Extract feature arrays from labelled positions
+
+Args:
+    - positions: iterable of (game_state, label) with label 1 (White won), 0.5 (draw), 0 (Black won)
+    - workers: number of worker processes (1 -> extract in this process)
+    - attack_term: attack penalty feature ("attackers" | "see", see MiniChessEngine.attack_term)
+Returns:
+    - X: float array (n, len(TERMS)) | unweighted heuristic terms (White - Black)
+    - material: float array (n,) | heuristic_e0 score
+    - y: float array (n,) | game outcome labels
+"""
+def extract_features(positions, workers=1, chunksize=256, attack_term="attackers"):
+    positions = (item for item in positions if not is_terminal(item[0]))
+    if workers > 1:
+        with multiprocessing.Pool(workers, init_worker, (attack_term,)) as pool:
+            rows = list(pool.imap(position_features, positions, chunksize))
+    else:
+        init_worker(attack_term)
+        rows = [position_features(item) for item in positions]
+
+    X = np.array([features for _, features, _ in rows], dtype=np.float64).reshape(len(rows), len(TERMS))
+    material = np.array([material for material, _, _ in rows], dtype=np.float64)
+    y = np.array([label for _, _, label in rows], dtype=np.float64)
+    return X, material, y
+
+###Save/load feature arrays (.npz) so positions are only extracted once (with the attack term they were extracted with)
+def save_features(path, X, material, y, attack_term="attackers"):
+    np.savez_compressed(path, X=X, material=material, y=y, terms=np.array(TERMS), attack_term=np.array(attack_term))
+
+def load_features(path):
+    data = np.load(path)
+    if list(data["terms"]) != TERMS:
+        raise ValueError(f"{path} was extracted with different terms: {list(data['terms'])}")
+    if "attack_term" not in data:
+        raise ValueError(f"{path} doesn't record its attack term, extract it again")
+    return data["X"], data["material"], data["y"], str(data["attack_term"])
+
+###Mean logistic loss of predictions sigmoid(scale * eval) against outcomes y
+def logistic_loss(evals, y, scale):
+    p = 1.0 / (1.0 + np.exp(-scale * evals))
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+###Scale mapping eval units to win probability (grid search with the current weights, all candidates at once)
+def fit_scale(evals, y, candidates=None):
+    if candidates is None:
+        candidates = np.logspace(-2, 1, 61)
+    p = 1.0 / (1.0 + np.exp(-np.outer(candidates, evals))) #(candidates, n)
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    losses = -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p), axis=1)
+    return float(candidates[np.argmin(losses)])
+
+"""
+Fit heuristic weights by minimizing the logistic loss (Adam on mini-batches, fully vectorized)
+
+Args:
+    - X, material, y: arrays from extract_features
+    - terms: terms to tune (E1_TERMS for e1, TERMS for e2), other columns are ignored
+    - weights: starting weights (dict), defaults to DEFAULT_HEURISTIC_WEIGHTS
+    - scale: fixed scale, fitted with the starting weights if None
+Returns:
+    - (weights dict, scale, final loss)
+"""
+def fit_weights(X, material, y, terms=TERMS, weights=None, scale=None, epochs=200, lr=0.01, batch_size=65536, seed=0):
+    weights = dict(weights or DEFAULT_HEURISTIC_WEIGHTS)
+    columns = [TERMS.index(term) for term in terms]
+    X = X[:, columns]
+    w = np.array([weights[term] for term in terms], dtype=np.float64)
+
+    if scale is None:
+        scale = fit_scale(material + X @ w, y)
+
+    rng = np.random.default_rng(seed)
+    m = np.zeros_like(w) #Adam moment estimates
+    v = np.zeros_like(w)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+    n = len(y)
+    for _ in range(epochs):
+        order = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            batch = order[start:start + batch_size]
+            Xb = X[batch]
+            p = 1.0 / (1.0 + np.exp(-scale * (material[batch] + Xb @ w)))
+            grad = scale * (Xb.T @ (p - y[batch])) / len(batch) #d(logistic loss)/dw
+
+            step += 1
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad * grad
+            w -= lr * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+    weights.update({term: float(value) for term, value in zip(terms, w)})
+    return weights, scale, logistic_loss(material + X @ w, y, scale)
+
+###Write tuned weights in the format read by Engine.load_heuristic_weights
+def save_weights(path, weights, heuristic, attack_term, scale, loss, positions):
+    with open(path, "w") as f:
+        json.dump({"heuristic": heuristic, "attack_term": attack_term, "scale": scale, "loss": loss, "positions": positions, "weights": weights}, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune heuristic e1/e2 weights from labelled positions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    extract = sub.add_parser("extract", help="extract feature arrays from game traces / self-play datasets")
+    extract.add_argument("inputs", nargs="+", help="gameTrace-*.txt files or SelfPlay.py .bin datasets (glob patterns allowed)")
+    extract.add_argument("--out", default="features.npz")
+    extract.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    extract.add_argument("--attack-term", choices=["attackers", "see"], default="attackers", help="attack penalty feature (see MiniChessEngine.attack_term)")
+
+    fit = sub.add_parser("fit", help="fit weights on extracted features")
+    fit.add_argument("features", nargs="+", help=".npz files written by extract")
+    fit.add_argument("--heuristic", choices=["e1", "e2"], default="e2")
+    fit.add_argument("--out", default=None, help="weights file (default: heuristic_weights_<heuristic>.json loaded by the engine)")
+    fit.add_argument("--epochs", type=int, default=200)
+    fit.add_argument("--lr", type=float, default=0.01)
+    fit.add_argument("--batch-size", type=int, default=65536)
+    fit.add_argument("--scale", type=float, default=None, help="fixed scale (fitted if omitted)")
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.command == "extract":
+        paths = sorted({path for pattern in args.inputs for path in glob.glob(pattern)})
+        traces = [path for path in paths if not path.endswith(".bin")]
+        datasets = [path for path in paths if path.endswith(".bin")]
+        positions = itertools.chain(trace_positions(traces), dataset_positions(datasets))
+        X, material, y = extract_features(positions, args.workers, attack_term=args.attack_term)
+        save_features(args.out, X, material, y, args.attack_term)
+        print(f"Extracted {len(y)} positions from {len(paths)} files to {args.out} in {time.time() - start:.1f} sec")
+    else:
+        arrays = [load_features(path) for path in args.features]
+        X = np.concatenate([a[0] for a in arrays])
+        material = np.concatenate([a[1] for a in arrays])
+        y = np.concatenate([a[2] for a in arrays])
+        if len(y) == 0:
+            parser.error("no positions to fit")
+        attack_terms = {a[3] for a in arrays}
+        if len(attack_terms) > 1:
+            parser.error(f"features were extracted with different attack terms: {sorted(attack_terms)}")
+        attack_term = attack_terms.pop()
+        out = args.out or heuristic_weights_file(args.heuristic)
+
+        terms = E1_TERMS if args.heuristic == "e1" else TERMS
+        start_weights = MiniChessEngine(args.heuristic, attack_term=attack_term).weights #current weights (tuned file or defaults)
+        weights, scale, loss = fit_weights(X, material, y, terms, start_weights, args.scale, args.epochs, args.lr, args.batch_size)
+        save_weights(out, weights, args.heuristic, attack_term, scale, loss, len(y))
+        print(f"Fitted {args.heuristic} weights ({attack_term} attack term) on {len(y)} positions (scale={scale:.4f}, loss={loss:.5f}) in {time.time() - start:.1f} sec")
+        for term in terms:
+            print(f"  {term}: {weights[term]:.4f}")
+        print(f"Weights written to {out}")
+
+if __name__ == "__main__":
+    main()